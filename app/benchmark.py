@@ -0,0 +1,282 @@
+"""
+benchmark.py
+Time the analytics, rendering and confidence paths on synthetic rasters.
+
+Deterministic LULC (2018, 2025), change (2018-2025) and confidence (2025)
+GeoTIFFs are generated per size. Every case then runs in a fresh process
+pointed at that data (DATA_DIR), so its peak RSS is its own.
+
+Usage:
+    python -m app.benchmark run [--sizes 1024 4096 ...] [--repeat 3] [--output results.json]
+    python -m app.benchmark compare baseline.json results.json [--threshold 0.2]
+"""
+import argparse
+import json
+import os
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+DEFAULT_SIZES = (1024, 2048, 4096)
+DEFAULT_WORKDIR = Path(tempfile.gettempdir()) / "tirupati_benchmark"
+SEED = 2025
+STRIP_ROWS = 512
+CELL = 32
+
+CASES = (
+    "area_stats",
+    "change_stats",
+    "create_lulc_image",
+    "create_change_image",
+    "create_confidence_image",
+    "confidence_summary",
+    "confidence_by_lulc",
+    "confidence_by_change",
+)
+
+
+# --------------------------------------------------
+# Synthetic data
+# --------------------------------------------------
+def _strip(size, row, rows):
+    """LULC 2018/2025, change and confidence for one strip of rows."""
+    rng = np.random.default_rng([SEED, size, row])
+    cells = (rows + CELL - 1) // CELL, (size + CELL - 1) // CELL
+
+    # Patchy class map: 32 px cells, 5% speckle, 1% nodata
+    old = rng.integers(1, 6, cells, dtype=np.uint8)
+    old = np.repeat(np.repeat(old, CELL, axis=0), CELL, axis=1)[:rows, :size]
+    speckle = rng.random((rows, size)) < 0.05
+    old[speckle] = rng.integers(1, 6, int(speckle.sum()), dtype=np.uint8)
+    old[rng.random((rows, size)) < 0.01] = 0
+
+    # 10% of cells change class between the two years
+    moved = np.repeat(np.repeat(rng.random(cells) < 0.1, CELL, axis=0), CELL, axis=1)[:rows, :size]
+    new = np.where(moved, rng.integers(1, 6, (rows, size), dtype=np.uint8), old)
+    new[old == 0] = 0
+
+    change = np.where((old > 0) & (new > 0), old * 10 + new, 0).astype(np.uint8)
+    confidence = np.where(new > 0, rng.integers(40, 101, (rows, size), dtype=np.uint8), 0)
+    return old, new, change, confidence.astype(np.uint8)
+
+
+def generate(size, root):
+    """Write the synthetic rasters for one size under root (skipped if present)."""
+    import rasterio
+    from rasterio.transform import from_bounds
+    from rasterio.windows import Window
+
+    paths = {
+        "old": root / "lulc" / "Tirupati_LULC_2018.tif",
+        "new": root / "lulc" / "Tirupati_LULC_2025.tif",
+        "change": root / "change" / "Tirupati_LULC_Change_2018_2025.tif",
+        "confidence": root / "confidence" / "Tirupati_Confidence_2025.tif",
+    }
+    if all(p.exists() for p in paths.values()):
+        return paths
+
+    profile = {
+        "driver": "GTiff",
+        "width": size,
+        "height": size,
+        "count": 1,
+        "dtype": "uint8",
+        "nodata": 0,
+        "crs": "EPSG:4326",
+        "transform": from_bounds(79.2, 13.4, 79.6, 13.8, size, size),
+        "tiled": True,
+        "blockxsize": 512,
+        "blockysize": 512,
+        "compress": "deflate",
+    }
+    for path in paths.values():
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+    with rasterio.open(paths["old"], "w", **profile) as old_dst, \
+            rasterio.open(paths["new"], "w", **profile) as new_dst, \
+            rasterio.open(paths["change"], "w", **profile) as change_dst, \
+            rasterio.open(paths["confidence"], "w", **profile) as conf_dst:
+        for row in range(0, size, STRIP_ROWS):
+            rows = min(STRIP_ROWS, size - row)
+            window = Window(0, row, size, rows)
+            for dst, data in zip((old_dst, new_dst, change_dst, conf_dst), _strip(size, row, rows)):
+                dst.write(data, 1, window=window)
+
+    print(f"✅ Generated {size}x{size} rasters in {root}")
+    return paths
+
+
+# --------------------------------------------------
+# Cases (run inside a child process with DATA_DIR set)
+# --------------------------------------------------
+def _case(name):
+    """(callable, reset) for one case; reset clears the shared caches."""
+    from app.routes import confidence
+    from app.services import analytics_service, image_service
+    from app.services.confidence_service import _value_histograms
+    from app.services.raster_cache import raster_cache
+    from app.services.raster_service import lulc_path, change_path, confidence_path, _read_raster
+
+    def reset():
+        raster_cache.clear()
+        _value_histograms.cache_clear()
+
+    if name.startswith("confidence_"):
+        handlers = {
+            "confidence_summary": lambda: confidence.confidence_summary(2025),
+            "confidence_by_lulc": lambda: confidence.confidence_by_lulc(2025),
+            "confidence_by_change": lambda: confidence.confidence_by_change(2018, 2025),
+        }
+        return handlers[name], reset
+
+    old, _ = _read_raster(lulc_path(2018))
+    if name == "area_stats":
+        return lambda: analytics_service.area_stats(old), reset
+    if name == "change_stats":
+        new, _ = _read_raster(lulc_path(2025))
+        return lambda: analytics_service.change_stats(old, new), reset
+    if name == "create_lulc_image":
+        return lambda: image_service.create_lulc_image(old), reset
+    if name == "create_change_image":
+        change, _ = _read_raster(change_path(2018, 2025))
+        return lambda: image_service.create_change_image(change), reset
+    if name == "create_confidence_image":
+        conf, _ = _read_raster(confidence_path(2025))
+        return lambda: image_service.create_confidence_image(conf), reset
+    raise ValueError(f"Unknown case: {name}")
+
+
+def run_case(name, size, repeat):
+    fn, reset = _case(name)
+    times = []
+    for _ in range(repeat):
+        reset()
+        started = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - started)
+
+    wall = statistics.median(times)
+    pixels = size * size
+    return {
+        "case": name,
+        "size": size,
+        "pixels": pixels,
+        "wall_s": round(wall, 6),
+        "min_s": round(min(times), 6),
+        "pixels_per_s": round(pixels / wall) if wall > 0 else None,
+        # ru_maxrss is KiB on Linux, bytes on macOS
+        "peak_rss_mb": round(
+            resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+            / (1024 ** 2 if sys.platform == "darwin" else 1024), 1
+        ),
+    }
+
+
+# --------------------------------------------------
+# Commands
+# --------------------------------------------------
+def run(sizes, repeat, cases, workdir, output):
+    results = []
+    for size in sizes:
+        root = workdir / str(size)
+        generate(size, root)
+        env = dict(os.environ, DATA_DIR=str(root))
+        for name in cases:
+            proc = subprocess.run(
+                [sys.executable, "-m", "app.benchmark", "case", name,
+                 "--size", str(size), "--repeat", str(repeat)],
+                env=env, capture_output=True, text=True
+            )
+            if proc.returncode != 0:
+                print(f"❌ {name} @ {size}: {proc.stderr.strip().splitlines()[-1:]}")
+                continue
+            result = json.loads(proc.stdout.strip().splitlines()[-1])
+            results.append(result)
+            print(
+                f"⏱️  {name:<24} {size:>6}²  {result['wall_s']:>9.4f}s  "
+                f"{result['pixels_per_s'] or 0:>14,} px/s  {result['peak_rss_mb']:>8.1f} MiB"
+            )
+
+    report = {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "repeat": repeat,
+        "results": results,
+    }
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"✅ Saved results: {output}")
+
+
+def compare(baseline_path, current_path, threshold):
+    """Print per-case ratios; returns the number of regressions."""
+    with open(baseline_path) as f:
+        baseline = {(r["case"], r["size"]): r for r in json.load(f)["results"]}
+    with open(current_path) as f:
+        current = {(r["case"], r["size"]): r for r in json.load(f)["results"]}
+
+    regressions = 0
+    for key in sorted(baseline.keys() & current.keys()):
+        old, new = baseline[key], current[key]
+        time_ratio = new["wall_s"] / old["wall_s"] if old["wall_s"] else 1.0
+        rss_ratio = new["peak_rss_mb"] / old["peak_rss_mb"] if old["peak_rss_mb"] else 1.0
+        flags = []
+        if time_ratio > 1 + threshold:
+            flags.append("time")
+        if rss_ratio > 1 + threshold:
+            flags.append("memory")
+        regressions += bool(flags)
+        status = f"❌ {'+'.join(flags)} regression" if flags else "✅"
+        print(f"{key[0]:<24} {key[1]:>6}²  time x{time_ratio:.2f}  rss x{rss_ratio:.2f}  {status}")
+
+    for key in sorted(baseline.keys() - current.keys()):
+        print(f"{key[0]:<24} {key[1]:>6}²  missing from {current_path}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[1])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="generate data and time every case")
+    run_parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES),
+                            help="raster side lengths in pixels")
+    run_parser.add_argument("--repeat", type=int, default=3,
+                            help="timed runs per case (median is reported)")
+    run_parser.add_argument("--cases", nargs="+", choices=CASES, default=list(CASES))
+    run_parser.add_argument("--workdir", type=Path, default=DEFAULT_WORKDIR,
+                            help="where synthetic rasters are generated and kept")
+    run_parser.add_argument("--output", default="benchmark_results.json")
+
+    compare_parser = commands.add_parser("compare", help="flag regressions against a baseline")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument("--threshold", type=float, default=0.2,
+                                help="allowed relative slowdown / RSS growth")
+
+    case_parser = commands.add_parser("case")
+    case_parser.add_argument("name", choices=CASES)
+    case_parser.add_argument("--size", type=int, required=True)
+    case_parser.add_argument("--repeat", type=int, default=3)
+
+    args = parser.parse_args()
+    if args.command == "run":
+        run(args.sizes, args.repeat, args.cases, args.workdir, args.output)
+    elif args.command == "compare":
+        raise SystemExit(1 if compare(args.baseline, args.current, args.threshold) else 0)
+    else:
+        print(json.dumps(run_case(args.name, args.size, args.repeat)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+cog.py
+Rewrite the LULC, change and confidence rasters as Cloud-Optimized GeoTIFFs
+with internal tiling, compression and an overview pyramid, so previews and
+zoomed-out tiles read a fraction of the full-resolution data.
+
+Usage:
+    python -m app.cog [--compression DEFLATE] [--blocksize 512] [--dry-run]
+
+Files are replaced in place (via a temporary file); rerun
+python -m app.precompute afterwards to refresh the statistics sidecars.
+"""
+import argparse
+import os
+from pathlib import Path
+
+import rasterio
+from rasterio.shutil import copy as raster_copy
+
+from app.config import LULC_DIR, CHANGE_DIR, CONFIDENCE_DIR
+
+# Overview resampling per layer: class codes must stay valid codes, so
+# categorical layers use the most frequent value; confidence keeps sampled
+# values.
+OVERVIEW_RESAMPLING = {
+    LULC_DIR: "MODE",
+    CHANGE_DIR: "MODE",
+    CONFIDENCE_DIR: "NEAREST",
+}
+
+
+def is_cog(path, blocksize):
+    """True if the raster is already tiled at blocksize and has overviews."""
+    with rasterio.open(path) as src:
+        tiled = src.block_shapes[0] == (blocksize, blocksize) or max(src.shape) <= blocksize
+        return tiled and (bool(src.overviews(1)) or max(src.shape) <= blocksize)
+
+
+def convert_to_cog(path, resampling="MODE", compression="DEFLATE", blocksize=512):
+    """Rewrite one GeoTIFF in place as a COG."""
+    path = Path(path)
+    tmp = path.with_suffix(f".{os.getpid()}.cog.tif")
+    try:
+        raster_copy(
+            path, tmp,
+            driver="COG",
+            COMPRESS=compression,
+            PREDICTOR="YES",
+            BLOCKSIZE=blocksize,
+            OVERVIEW_RESAMPLING=resampling,
+            RESAMPLING=resampling,
+            BIGTIFF="IF_SAFER",
+        )
+        os.replace(tmp, path)
+    finally:
+        if tmp.exists():
+            tmp.unlink()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[1])
+    parser.add_argument("--compression", default="DEFLATE",
+                        help="COG compression (DEFLATE, LZW, ZSTD, ...)")
+    parser.add_argument("--blocksize", type=int, default=512, help="internal tile size")
+    parser.add_argument("--force", action="store_true",
+                        help="convert even rasters that already look like COGs")
+    parser.add_argument("--dry-run", action="store_true", help="only list the rasters")
+    args = parser.parse_args()
+
+    for directory, resampling in OVERVIEW_RESAMPLING.items():
+        if not directory.exists():
+            continue
+        for path in sorted(directory.glob("*.tif")):
+            if not args.force and is_cog(path, args.blocksize):
+                print(f"⏭️  {path.name} (already a COG)")
+                continue
+            if args.dry_run:
+                print(f"➡️  {path.name} ({resampling} overviews)")
+                continue
+            convert_to_cog(path, resampling, args.compression, args.blocksize)
+            print(f"✅ Converted: {path.name}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,65 @@
+import os
 from pathlib import Path
 
 BASE_DIR = Path(__file__).resolve().parent.parent
 
-DATA_DIR = BASE_DIR / "data" / "gee_outputs"
+DATA_DIR = Path(os.environ.get("DATA_DIR", BASE_DIR / "data" / "gee_outputs"))
 
 LULC_DIR = DATA_DIR / "lulc"
 CHANGE_DIR = DATA_DIR / "change"
 CONFIDENCE_DIR = DATA_DIR / "confidence"
+
+# Administrative boundary layer used for zonal statistics; ZONE_NAME_FIELD
+# selects the attribute holding zone names (first of ZONE_NAME_FIELDS found
+# otherwise)
+BOUNDARY_DIR = BASE_DIR / "data" / "boundary"
+ZONES_PATH = Path(os.environ.get(
+    "ZONES_PATH", BOUNDARY_DIR / "Tirupati_Boundary" / "Tirupati.shp"
+))
+ZONE_NAME_FIELD = os.environ.get("ZONE_NAME_FIELD")
+ZONE_NAME_FIELDS = ("WARD", "MANDAL", "NAME", "DISTRICT")
+
+# Precomputed statistics sidecars (python -m app.precompute)
+SUMMARY_DIR = DATA_DIR / "summaries"
+
+# Uncompressed memory-mappable copies of the rasters (python -m app.ingest)
+ARRAY_STORE_DIR = Path(os.environ.get("ARRAY_STORE_DIR", DATA_DIR / "store"))
+
+# Memory budget (bytes) for decoded rasters shared across requests
+RASTER_CACHE_BYTES = int(os.environ.get("RASTER_CACHE_BYTES", 1024 ** 3))
+
+# Encoded map overlay cache: in-memory budget (bytes) and optional spill dir
+RENDER_CACHE_BYTES = int(os.environ.get("RENDER_CACHE_BYTES", 256 * 1024 ** 2))
+RENDER_CACHE_DIR = os.environ.get("RENDER_CACHE_DIR") or None
+
+# Cache-Control sent with rendered map images (revalidated through ETags)
+MAP_CACHE_CONTROL = os.environ.get("MAP_CACHE_CONTROL", "public, max-age=86400")
+
+# Upper bound (pixels) on the raster window held in memory by streaming stats
+STATS_WINDOW_PIXELS = int(os.environ.get("STATS_WINDOW_PIXELS", 4 * 1024 ** 2))
+
+# zlib level for rendered PNGs: 1 = fastest, 9 = smallest
+PNG_COMPRESS_LEVEL = int(os.environ.get("PNG_COMPRESS_LEVEL", 6))
+
+# Worker threads for the blocking raster reads / renders of every API route
+RASTER_WORKERS = int(os.environ.get("RASTER_WORKERS", min(4, os.cpu_count() or 1)))
+
+# Opt-in per-request profiling (X-Profile header or ?profile= query flag);
+# dumps are written to PROFILE_DIR
+PROFILING_ENABLED = os.environ.get("PROFILING_ENABLED", "0").lower() in ("1", "true", "yes")
+PROFILE_DIR = Path(os.environ.get("PROFILE_DIR", BASE_DIR / "profiles"))
+
+# Startup warm-up of the raster/summary caches (GET /ready reports progress)
+WARMUP_ENABLED = os.environ.get("WARMUP_ENABLED", "1").lower() in ("1", "true", "yes")
+WARMUP_WORKERS = int(os.environ.get("WARMUP_WORKERS", RASTER_WORKERS))
+
+# Seconds between dataset catalog revalidations (directory listing + stat);
+# lookups in between never touch the filesystem
+CATALOG_TTL = float(os.environ.get("CATALOG_TTL", 5))
+
+# Streamed /export responses are flushed in chunks of about this many bytes
+EXPORT_CHUNK_BYTES = int(os.environ.get("EXPORT_CHUNK_BYTES", 256 * 1024))
+
+# Change-hotspot grid cell sizes (metres), finest first; each must be a
+# multiple of the finest. Served at /change/{start}/{end}/hotspots?cell=
+HOTSPOT_CELLS = tuple(int(c) for c in os.environ.get("HOTSPOT_CELLS", "250,1000,5000").split(","))
@@ -0,0 +1,39 @@
+"""
+ingest.py
+Write every LULC, change and confidence raster to the memory-mapped array
+store, so API workers open them without decompression and share one
+page-cached copy, and build the multi-year pixel cube next to them.
+
+Usage:
+    python -m app.ingest [--force]
+"""
+import argparse
+
+from app.config import LULC_DIR, CHANGE_DIR, CONFIDENCE_DIR
+from app.services.array_store import is_current, write_array
+from app.services.cube_service import get_cube
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[1])
+    parser.add_argument("--force", action="store_true",
+                        help="rewrite entries that are already current")
+    args = parser.parse_args()
+
+    for directory in (LULC_DIR, CHANGE_DIR, CONFIDENCE_DIR):
+        if not directory.exists():
+            continue
+        for path in sorted(directory.glob("*.tif")):
+            if not args.force and is_current(path):
+                print(f"⏭️  {path.name} (store is current)")
+                continue
+            out = write_array(path)
+            print(f"✅ Stored: {out}")
+
+    cube = get_cube()
+    if cube is not None:
+        print(f"✅ Pixel cube: {len(cube.years)} years, {len(cube.confidence_years)} with confidence")
+
+
+if __name__ == "__main__":
+    main()
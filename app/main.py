@@ -1,10 +1,31 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
-from app.routes import lulc, change, confidence, map
+from app.config import PROFILING_ENABLED
+from app.routes import lulc, change, confidence, map, zones, roi, pixel, analytics, export
+from app.routes.instrumented import TimedJSONResponse
+from app.services.raster_cache import raster_cache
+from app.services.render_cache import render_cache
+from app.services.executor import single_flight
+from app.services.metrics import metrics
+from app.services.profiling import profile_mode, start_profile, stop_profile
+from app.services.warmup import warmup
+from app.services.catalog import catalog
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Hydrate the caches in the background; GET /ready reports progress
+    warmup.start()
+    yield
+    warmup.stop()
 
 app = FastAPI(
     title="Tirupati GeoAI Backend",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=TimedJSONResponse,
+    lifespan=lifespan
 )
 
 # Enable CORS for frontend
@@ -16,12 +37,87 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+async def profile_request(request: Request, call_next):
+    """Opt-in profiling (PROFILING_ENABLED + X-Profile header or ?profile=1)."""
+    mode = profile_mode(request)
+    if mode is None:
+        return await call_next(request)
+
+    profile, token = start_profile(request.url.path, mode)
+    try:
+        response = await call_next(request)
+    finally:
+        stop_profile(token)
+    path = profile.dump()
+    if path is not None:
+        response.headers["X-Profile-Path"] = str(path)
+    return response
+
+# Registered only when enabled: an HTTP middleware adds a task/stream hop
+# to every response (including streamed exports)
+if PROFILING_ENABLED:
+    app.middleware("http")(profile_request)
+
 app.include_router(lulc.router, prefix="/lulc", tags=["LULC"])
 app.include_router(change.router, prefix="/change", tags=["Change"])
 app.include_router(confidence.router, prefix="/confidence", tags=["Confidence"])
 app.include_router(map.router, prefix="/map", tags=["Map Imagery"])
+app.include_router(zones.router, prefix="/zones", tags=["Zonal Statistics"])
+app.include_router(roi.router, prefix="/roi", tags=["Region of Interest"])
+app.include_router(pixel.router, prefix="/pixel", tags=["Pixel Trajectory"])
+app.include_router(analytics.router, prefix="/analytics", tags=["Analytics"])
+app.include_router(export.router, prefix="/export", tags=["Export"])
 
 
 @app.get("/")
 def health():
     return {"status": "Backend running successfully"}
+
+
+@app.get("/ready")
+def readiness():
+    """
+    Readiness probe: 200 once the startup warm-up has finished (or is
+    disabled), 503 while it is still running. Layers or summaries that
+    failed to warm are listed with state "degraded" but do not fail it.
+    """
+    status = warmup.status()
+    return JSONResponse(status, status_code=200 if status["ready"] else 503)
+
+
+@app.get("/catalog")
+def dataset_catalog(refresh: bool = False, hashes: bool = True):
+    """
+    Served rasters with their metadata and fingerprints. The index is
+    revalidated every CATALOG_TTL seconds; refresh=true rescans now.
+    """
+    if refresh:
+        catalog.refresh(force=True)
+    return catalog.describe(hashes=hashes)
+
+
+@app.get("/cache")
+def cache_stats():
+    """Counters of the shared raster/render caches and request coalescing."""
+    return {
+        "raster": raster_cache.stats(),
+        "render": render_cache.stats(),
+        "single_flight": single_flight.stats()
+    }
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def prometheus_metrics():
+    """Stage latency histograms, byte counters and cache counters (Prometheus format)."""
+    gauges = {}
+    for prefix, stats in (
+        ("raster_cache", raster_cache.stats()),
+        ("render_cache", render_cache.stats()),
+        ("single_flight", single_flight.stats()),
+    ):
+        for key, value in stats.items():
+            if isinstance(value, (int, float)):
+                gauges[f"{prefix}_{key}"] = value
+    return PlainTextResponse(
+        metrics.render(gauges), media_type="text/plain; version=0.0.4"
+    )
@@ -0,0 +1,70 @@
+"""
+precompute.py
+Precompute every area table, transition matrix, confidence breakdown and
+change-hotspot grid served by the API and write them as sidecar summaries.
+
+Usage:
+    python -m app.precompute [--workers N]
+"""
+import argparse
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from app.config import HOTSPOT_CELLS
+from app.services.catalog import catalog
+from app.services.summary_store import summary_name, write_summary
+
+
+def discover_jobs():
+    """(kind, *params) for every summary the dataset catalog supports."""
+    lulc_years = set(catalog.years("lulc"))
+    change_pairs = catalog.keys("change")
+    conf_years = set(catalog.years("confidence"))
+
+    jobs = [("lulc", year) for year in sorted(lulc_years)]
+    jobs += [("confidence", year) for year in sorted(conf_years)]
+    jobs += [("confidence_lulc", year) for year in sorted(conf_years & lulc_years)]
+
+    for start, end in change_pairs:
+        if start in lulc_years and end in lulc_years:
+            jobs.append(("change", start, end))
+        if end in conf_years:
+            jobs.append(("confidence_change", start, end))
+        jobs += [("hotspots", start, end, cell) for cell in HOTSPOT_CELLS]
+    return jobs
+
+
+def _run(job):
+    started = time.perf_counter()
+    write_summary(*job)
+    return job, time.perf_counter() - started
+
+
+def precompute(workers=None):
+    jobs = discover_jobs()
+    print(f"Precomputing {len(jobs)} summaries")
+
+    failed = 0
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(_run, job) for job in jobs]
+        for future in as_completed(futures):
+            try:
+                job, seconds = future.result()
+                print(f"✅ {summary_name(*job)} ({seconds:.2f}s)")
+            except Exception as e:
+                failed += 1
+                print(f"❌ {e}")
+
+    return failed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--workers", type=int, default=None,
+                        help="worker processes (default: CPU count)")
+    args = parser.parse_args()
+    raise SystemExit(1 if precompute(args.workers) else 0)
+
+
+if __name__ == "__main__":
+    main()
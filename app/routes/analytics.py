@@ -0,0 +1,34 @@
+from typing import List, Tuple
+from fastapi import APIRouter, HTTPException
+from pydantic import BaseModel
+from app.services.batch_service import batch_analytics
+from app.services.executor import single_flight
+from app.services.raster_service import lulc_path
+from app.services.catalog import catalog
+from app.routes.instrumented import InstrumentedRoute
+
+router = APIRouter(route_class=InstrumentedRoute)
+
+class BatchRequest(BaseModel):
+    """Years for area tables and (start, end) pairs for transition matrices."""
+    years: List[int] = []
+    pairs: List[Tuple[int, int]] = []
+
+@router.post("/batch")
+async def analytics_batch(request: BatchRequest):
+    """
+    Area tables, transition matrices and per-class time series for many
+    years in one request, scanning each LULC raster at most once.
+    """
+    if not request.years and not request.pairs:
+        raise HTTPException(status_code=400, detail="Provide at least one year or pair")
+
+    key = ("batch", tuple(sorted(set(request.years))), tuple(request.pairs))
+    return await single_flight.run(key, _batch, request.years, request.pairs)
+
+def _batch(years, pairs):
+    for year in sorted(set(years).union(*pairs)):
+        path = lulc_path(year)
+        if catalog.info(path) is None:
+            raise HTTPException(status_code=404, detail=f"LULC file not found for year {year}: {path}")
+    return batch_analytics(years, pairs)
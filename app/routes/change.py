@@ -1,11 +1,40 @@
-from fastapi import APIRouter
-from app.services.raster_service import load_lulc
-from app.services.analytics_service import change_stats
+from fastapi import APIRouter, HTTPException, Query
+from app.config import HOTSPOT_CELLS
+from app.services.catalog import catalog
+from app.services.executor import single_flight
+from app.services.summary_store import get_summary
+from app.routes.instrumented import InstrumentedRoute
 
-router = APIRouter()
+router = APIRouter(route_class=InstrumentedRoute)
 
 @router.get("/{start_year}/{end_year}")
-def lulc_change(start_year: int, end_year: int):
-    old = load_lulc(start_year)
-    new = load_lulc(end_year)
-    return change_stats(old, new)
+async def lulc_change(start_year: int, end_year: int):
+    return await single_flight.run(
+        ("change", start_year, end_year), get_summary, "change", start_year, end_year
+    )
+
+@router.get("/{start_year}/{end_year}/hotspots")
+async def change_hotspots(start_year: int, end_year: int, cell: int = Query(HOTSPOT_CELLS[-1])):
+    """
+    Change density grid as GeoJSON: one polygon per grid cell (cell metres
+    wide) containing change, with its changed area and dominant transition.
+    """
+    if cell not in HOTSPOT_CELLS:
+        raise HTTPException(
+            status_code=400,
+            detail={"error": f"Unsupported cell size {cell} m", "cells": list(HOTSPOT_CELLS)}
+        )
+    return await single_flight.run(
+        ("hotspots", start_year, end_year, cell), _hotspots, start_year, end_year, cell
+    )
+
+def _hotspots(start_year, end_year, cell):
+    if catalog.get("change", start_year, end_year) is None:
+        raise HTTPException(
+            status_code=404,
+            detail={
+                "error": f"No change raster for {start_year} → {end_year}",
+                "valid_combinations": [f"{a} → {b}" for a, b in catalog.keys("change")]
+            }
+        )
+    return get_summary("hotspots", start_year, end_year, cell)
@@ -1,92 +1,52 @@
-import os
-import numpy as np
-import rasterio
-from fastapi import APIRouter, HTTPException
+from typing import List
+from fastapi import APIRouter, HTTPException, Query
 import logging
+from app.services.catalog import catalog
+from app.services.confidence_service import distribution
+from app.services.summary_store import get_summary
+from app.services.executor import on_raster_pool
+from app.routes.instrumented import InstrumentedRoute
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-router = APIRouter()
+router = APIRouter(route_class=InstrumentedRoute)
 
 # --------------------------------------------------
-# Base paths
+# Layer lookup (dataset catalog, no filesystem access)
 # --------------------------------------------------
-BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
-GEE_DIR = os.path.join(BASE_DIR, "gee_outputs")
-
-CONFIDENCE_DIR = os.path.join(GEE_DIR, "confidence")
-LULC_DIR = os.path.join(GEE_DIR, "lulc")
-CHANGE_DIR = os.path.join(GEE_DIR, "change")
-
-# --------------------------------------------------
-# Mappings
-# --------------------------------------------------
-LULC_CLASSES = {
-    1: "Forest",
-    2: "Water Bodies",
-    3: "Agriculture",
-    4: "Barren Land",
-    5: "Built-up"
-}
-
-CONFIDENCE_MAP = {
-    2024: "Tirupati_Confidence_2024.tif",
-    2025: "Tirupati_Confidence_2025.tif"
-}
-
-CHANGE_MAP = {
-    (2019, 2024): "Tirupati_LULC_Change_2019_2024.tif",
-    (2018, 2025): "Tirupati_LULC_Change_2018_2025.tif"
-}
+def _confidence_layer(year: int, error=None):
+    """Catalog record of a confidence year; 400 listing the available years otherwise."""
+    record = catalog.get("confidence", year)
+    if record is None:
+        raise HTTPException(
+            status_code=400,
+            detail={
+                "error": error or f"Confidence data not available for year {year}",
+                "available_years": catalog.years("confidence")
+            }
+        )
+    return record
 
 # --------------------------------------------------
 # Overall confidence summary
 # --------------------------------------------------
 @router.get("/{year}")
+@on_raster_pool
 def confidence_summary(year: int):
     """
     Get confidence statistics for a given year.
     
-    Available years: 2024, 2025
+    Available years: see GET /catalog
     """
     try:
-        # Validate year
-        if year not in CONFIDENCE_MAP:
-            raise HTTPException(
-                status_code=400,
-                detail={
-                    "error": f"Confidence data not available for year {year}",
-                    "available_years": list(CONFIDENCE_MAP.keys())
-                }
-            )
+        # Validate year against the catalog
+        conf_path = str(_confidence_layer(year)["path"])
 
-        # Construct path
-        conf_path = os.path.join(CONFIDENCE_DIR, CONFIDENCE_MAP[year])
-        
-        # Check file existence
-        if not os.path.exists(conf_path):
-            # List what files ARE in the directory
-            available_files = []
-            if os.path.exists(CONFIDENCE_DIR):
-                available_files = os.listdir(CONFIDENCE_DIR)
-            
-            raise HTTPException(
-                status_code=404,
-                detail={
-                    "error": "Confidence file not found",
-                    "expected_path": conf_path,
-                    "confidence_dir": CONFIDENCE_DIR,
-                    "confidence_dir_exists": os.path.exists(CONFIDENCE_DIR),
-                    "available_files": available_files
-                }
-            )
-
-        # Open and read raster
+        # Stream the raster through running accumulators
         try:
-            with rasterio.open(conf_path) as src:
-                data = src.read(1)
+            stats = get_summary("confidence", year)
         except Exception as raster_error:
             logger.error(f"Rasterio error: {str(raster_error)}")
             raise HTTPException(
@@ -98,26 +58,14 @@ def confidence_summary(year: int):
                 }
             )
 
-        # Filter valid data: confidence value 0 represents nodata/background
-        valid = data[data > 0]
-
-        if valid.size == 0:
+        if stats is None:
             raise HTTPException(
                 status_code=404,
                 detail="No valid confidence pixels found in raster"
             )
 
-        # Calculate statistics with JSON-safe types
-        return {
-            "year": year,
-            "min": int(valid.min()),
-            "max": int(valid.max()),
-            "mean": round(float(valid.mean()), 2),
-            "median": int(np.median(valid)),
-            "valid_pixels": int(valid.size),
-            "total_pixels": int(data.size),
-            "coverage_percent": round((valid.size / data.size) * 100, 2)
-        }
+        # Statistics are computed with JSON-safe types
+        return {"year": year, **stats}
     
     except HTTPException:
         # Re-raise HTTP exceptions as-is
@@ -136,137 +84,92 @@ def confidence_summary(year: int):
         )
 
 # --------------------------------------------------
-# Confidence by LULC class
+# Confidence distribution (percentiles / histograms)
 # --------------------------------------------------
-@router.get("/lulc/{year}")
-def confidence_by_lulc(year: int):
-    if year not in CONFIDENCE_MAP:
-        raise HTTPException(status_code=400, detail="Confidence data not available for this year")
-
-    lulc_path = os.path.join(LULC_DIR, f"Tirupati_LULC_{year}.tif")
-    conf_path = os.path.join(CONFIDENCE_DIR, CONFIDENCE_MAP[year])
+@router.get("/{year}/distribution")
+@on_raster_pool
+def confidence_distribution(
+    year: int,
+    percentiles: List[float] = Query([5, 25, 50, 75, 95]),
+    bins: int = Query(10, ge=1, le=1000)
+):
+    """
+    Exact confidence percentiles and a binned histogram for a given year,
+    overall and per LULC class (when the LULC raster for that year exists).
+    Computed from per-value counts in a single pass, without sorting.
+    """
+    conf_path = _confidence_layer(year)["path"]
 
-    if not os.path.exists(lulc_path):
+    invalid = [q for q in percentiles if not 0 <= q <= 100]
+    if invalid:
         raise HTTPException(
-            status_code=404,
-            detail=f"LULC file not found at {lulc_path}"
+            status_code=400,
+            detail=f"Percentiles must be between 0 and 100, got {invalid}"
         )
 
-    if not os.path.exists(conf_path):
+    lulc = catalog.get("lulc", year)
+    lulc_path = lulc["path"] if lulc is not None else None
+    lulc_nodata = lulc["nodata"] if lulc is not None else None
+
+    result = distribution(conf_path, lulc_path, lulc_nodata, percentiles, bins)
+    if result is None:
         raise HTTPException(
             status_code=404,
-            detail=f"Confidence file not found at {conf_path}"
+            detail="No valid confidence pixels found in raster"
         )
 
-    with rasterio.open(lulc_path) as lulc_src, rasterio.open(conf_path) as conf_src:
-        lulc = lulc_src.read(1)
-        conf = conf_src.read(1)
+    return {"year": year, "bins": bins, **result}
 
-        lulc_nodata = lulc_src.nodata
+# --------------------------------------------------
+# Confidence by LULC class
+# --------------------------------------------------
+@router.get("/lulc/{year}")
+@on_raster_pool
+def confidence_by_lulc(year: int):
+    if catalog.get("confidence", year) is None:
+        raise HTTPException(status_code=400, detail="Confidence data not available for this year")
 
-    # Create valid data mask
-    # Confidence value 0 represents nodata/background
-    mask = (conf > 0)
-    
-    if lulc_nodata is not None:
-        mask &= lulc != lulc_nodata
+    if catalog.get("lulc", year) is None:
+        raise HTTPException(
+            status_code=404,
+            detail=f"LULC data not found for {year}"
+        )
 
     result = {"year": year}
-
-    for class_id, class_name in LULC_CLASSES.items():
-        class_mask = (lulc == class_id) & mask
-
-        result[class_name] = {
-            "mean_confidence": round(float(conf[class_mask].mean()), 2)
-            if class_mask.any() else None,
-            "pixel_count": int(class_mask.sum())
-        }
-
+    result.update(get_summary("confidence_lulc", year))
     return result
 
 # --------------------------------------------------
 # Confidence analysis for change detection
 # --------------------------------------------------
 @router.get("/change/{start_year}/{end_year}")
+@on_raster_pool
 def confidence_by_change(start_year: int, end_year: int):
     """
     Analyze confidence statistics for changed vs unchanged pixels.
     
-    Valid year pairs:
-    - 2019 → 2024
-    - 2018 → 2025
+    Valid year pairs: every change raster listed by GET /catalog
     """
     # Validate year combination
-    year_pair = (start_year, end_year)
-    if year_pair not in CHANGE_MAP:
+    if catalog.get("change", start_year, end_year) is None:
         raise HTTPException(
             status_code=400,
             detail={
                 "error": f"Invalid year combination: {start_year} → {end_year}",
-                "valid_combinations": ["2019 → 2024", "2018 → 2025"]
+                "valid_combinations": [f"{a} → {b}" for a, b in catalog.keys("change")]
             }
         )
     
     # Validate end year has confidence data
-    if end_year not in CONFIDENCE_MAP:
-        raise HTTPException(
-            status_code=400,
-            detail={
-                "error": f"No confidence data available for end year {end_year}",
-                "available_years": list(CONFIDENCE_MAP.keys())
-            }
-        )
-    
-    # Construct file paths
-    change_path = os.path.join(CHANGE_DIR, CHANGE_MAP[year_pair])
-    conf_path = os.path.join(CONFIDENCE_DIR, CONFIDENCE_MAP[end_year])
-    
-    # Check file existence
-    if not os.path.exists(change_path):
-        raise HTTPException(
-            status_code=404,
-            detail=f"Change detection file not found: {change_path}"
-        )
-    
-    if not os.path.exists(conf_path):
-        raise HTTPException(
-            status_code=404,
-            detail=f"Confidence file not found: {conf_path}"
-        )
+    _confidence_layer(end_year, f"No confidence data available for end year {end_year}")
     
     try:
-        # Load rasters
-        with rasterio.open(change_path) as change_src, rasterio.open(conf_path) as conf_src:
-            change_data = change_src.read(1)
-            conf_data = conf_src.read(1)
-        
-        # Create valid data mask
-        # Confidence value 0 represents nodata/background
-        valid_mask = (conf_data > 0)
-        
-        # Identify changed vs unchanged pixels
-        # Change raster: 0 = unchanged, non-zero = changed
-        changed_mask = (change_data != 0) & valid_mask
-        unchanged_mask = (change_data == 0) & valid_mask
-        
-        # Calculate statistics for changed pixels
-        changed_conf = conf_data[changed_mask]
-        changed_stats = {
-            "mean_confidence": round(float(changed_conf.mean()), 2) if changed_conf.size > 0 else None,
-            "pixel_count": int(changed_mask.sum())
-        }
-        
-        # Calculate statistics for unchanged pixels
-        unchanged_conf = conf_data[unchanged_mask]
-        unchanged_stats = {
-            "mean_confidence": round(float(unchanged_conf.mean()), 2) if unchanged_conf.size > 0 else None,
-            "pixel_count": int(unchanged_mask.sum())
-        }
+        stats = get_summary("confidence_change", start_year, end_year)
         
         return {
             "period": f"{start_year}-{end_year}",
-            "changed": changed_stats,
-            "unchanged": unchanged_stats
+            "changed": stats["changed"],
+            "unchanged": stats["unchanged"]
         }
     
     except Exception as e:
@@ -0,0 +1,119 @@
+import os
+from typing import List, Optional
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from app.config import ZONES_PATH
+from app.services.catalog import catalog
+from app.services.export_service import (
+    REPORT_COLUMNS, ENCODERS, stream_export,
+    lulc_batches, change_batches, zone_batches, pixel_batches
+)
+from app.services.executor import on_raster_pool, iterate_on_pool
+from app.routes.instrumented import InstrumentedRoute
+
+router = APIRouter(route_class=InstrumentedRoute)
+
+def _lulc_paths(years):
+    years = sorted(set(years)) or catalog.years("lulc")
+    missing = [y for y in years if catalog.get("lulc", y) is None]
+    if missing:
+        raise HTTPException(
+            status_code=404,
+            detail={"error": f"LULC data not found for {missing}", "available_years": catalog.years("lulc")}
+        )
+    return {y: catalog.get("lulc", y)["path"] for y in years}
+
+def _parse_pairs(pairs):
+    parsed = []
+    for pair in pairs:
+        try:
+            start, end = (int(y) for y in pair.split("-"))
+        except ValueError:
+            raise HTTPException(status_code=400, detail=f"Invalid pair '{pair}', expected START-END")
+        parsed.append((start, end))
+    return list(dict.fromkeys(parsed)) or catalog.keys("change")
+
+def _pair_paths(start, end, need_confidence):
+    """(old, new, conf) paths of a pair on one grid; conf is None when not available."""
+    old, new = _lulc_paths([start, end]).values()
+    conf = catalog.get("confidence", end)
+    if conf is None and need_confidence:
+        raise HTTPException(
+            status_code=400,
+            detail={
+                "error": f"No confidence data available for end year {end}",
+                "available_years": catalog.years("confidence")
+            }
+        )
+    records = [catalog.info(old), catalog.info(new)]
+    if need_confidence or (conf is not None and conf["shape"] == records[0]["shape"]):
+        records.append(conf)
+    shapes = {r["shape"] for r in records}
+    if len(shapes) > 1:
+        raise HTTPException(status_code=400, detail=f"Raster shapes differ for {start}-{end}: {sorted(shapes)}")
+    return old, new, records[2]["path"] if len(records) > 2 else None
+
+@router.get("/{report}")
+@on_raster_pool
+def export_report(
+    report: str,
+    format: str = Query("csv"),
+    gzip: bool = False,
+    years: List[int] = Query([]),
+    pairs: List[str] = Query([]),
+    start_year: Optional[int] = None,
+    end_year: Optional[int] = None,
+    min_confidence: Optional[float] = Query(None, ge=0),
+    changed_only: bool = True
+):
+    """
+    Stream a report as CSV or NDJSON rows (gzip=true compresses on the fly):
+
+    - lulc: class areas per year (years, default all)
+    - zones: class areas per zone and year (years, default all)
+    - change: transition areas per pair (pairs as START-END, default all
+      published change layers), optionally only pixels whose end-year
+      confidence is at least min_confidence
+    - pixels: one row per pixel of start_year -> end_year (changed pixels
+      only unless changed_only=false), with end-year confidence when available
+
+    Chunks are produced on the raster pool.
+    """
+    if report not in REPORT_COLUMNS:
+        raise HTTPException(
+            status_code=404,
+            detail={"error": f"Unknown report '{report}'", "reports": list(REPORT_COLUMNS)}
+        )
+    if format not in ENCODERS:
+        raise HTTPException(status_code=400, detail=f"Unsupported format '{format}', use one of {list(ENCODERS)}")
+
+    if report == "lulc":
+        paths = _lulc_paths(years)
+        batches, label = lulc_batches(paths), "_".join(map(str, paths))
+    elif report == "zones":
+        if not os.path.exists(ZONES_PATH):
+            raise HTTPException(status_code=404, detail=f"Boundary file not found: {ZONES_PATH}")
+        paths = _lulc_paths(years)
+        batches, label = zone_batches(paths), "_".join(map(str, paths))
+    elif report == "change":
+        pairs = _parse_pairs(pairs)
+        if not pairs:
+            raise HTTPException(status_code=400, detail="Provide at least one pair")
+        sources = {p: _pair_paths(*p, min_confidence is not None) for p in pairs}
+        batches, label = change_batches(sources, min_confidence), "_".join(f"{a}-{b}" for a, b in pairs)
+    else:
+        if start_year is None or end_year is None:
+            raise HTTPException(status_code=400, detail="The pixels report needs start_year and end_year")
+        old, new, conf = _pair_paths(start_year, end_year, min_confidence is not None)
+        batches = pixel_batches(old, new, conf, min_confidence, changed_only)
+        label = f"{start_year}-{end_year}"
+
+    media_type, _ = ENCODERS[format]
+    filename = f"tirupati_{report}_{label}.{format}"
+    if gzip:
+        media_type, filename = "application/gzip", filename + ".gz"
+    return StreamingResponse(
+        iterate_on_pool(stream_export(REPORT_COLUMNS[report], batches, format, gzip)),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
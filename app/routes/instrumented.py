@@ -0,0 +1,70 @@
+import asyncio
+import time
+from functools import wraps
+from fastapi import HTTPException
+from fastapi.responses import JSONResponse
+from fastapi.routing import APIRoute
+from app.services.metrics import metrics, stage
+from app.services.profiling import profiled_call
+
+def _profiled_endpoint(endpoint):
+    """Sync handlers run in a worker thread; profile them there when asked."""
+    if asyncio.iscoroutinefunction(endpoint):
+        return endpoint
+
+    @wraps(endpoint)
+    def wrapper(*args, **kwargs):
+        return profiled_call(endpoint, *args, **kwargs)
+    return wrapper
+
+class TimedJSONResponse(JSONResponse):
+    """JSONResponse recording serialization time as the json_encode stage."""
+
+    def render(self, content):
+        with stage("json_encode"):
+            return super().render(content)
+
+def _route_label(request, template):
+    """
+    Full route template of a request, e.g. /lulc/{year}. The route only
+    knows its own template; the router prefix is taken from the request path.
+    """
+    depth = template.count("/")
+    path = request.scope["path"]
+    prefix = path.rsplit("/", depth)[0] if depth else path
+    return prefix + template
+
+class InstrumentedRoute(APIRoute):
+    """
+    Route recording request latency and response bytes per route template,
+    and enabling per-request profiling of sync handlers.
+    """
+
+    def __init__(self, path, endpoint, **kwargs):
+        super().__init__(path, _profiled_endpoint(endpoint), **kwargs)
+
+    def get_route_handler(self):
+        handler = super().get_route_handler()
+        template = self.path_format
+
+        async def instrumented(request):
+            route = _route_label(request, template)
+            started = time.perf_counter()
+            status = 500
+            try:
+                response = await handler(request)
+                status = response.status_code
+                body = getattr(response, "body", None)
+                if body is not None:
+                    metrics.inc("http_response_bytes_total", len(body), route=route)
+                return response
+            except HTTPException as e:
+                status = e.status_code
+                raise
+            finally:
+                metrics.observe(
+                    "http_request_duration_seconds", time.perf_counter() - started,
+                    route=route, method=request.method, status=status
+                )
+
+        return instrumented
@@ -1,10 +1,10 @@
 from fastapi import APIRouter
-from app.services.raster_service import load_lulc
-from app.services.analytics_service import area_stats
+from app.services.executor import single_flight
+from app.services.summary_store import get_summary
+from app.routes.instrumented import InstrumentedRoute
 
-router = APIRouter()
+router = APIRouter(route_class=InstrumentedRoute)
 
 @router.get("/{year}")
-def lulc_area(year: int):
-    lulc = load_lulc(year)
-    return area_stats(lulc)
\ No newline at end of file
+async def lulc_area(year: int):
+    return await single_flight.run(("lulc", year), get_summary, "lulc", year)
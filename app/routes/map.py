@@ -1,44 +1,116 @@
-from fastapi import APIRouter, Response, HTTPException
-from app.services.raster_service import load_lulc, load_change, load_confidence
+from typing import Optional
+from fastapi import APIRouter, Query, Request, Response, HTTPException
+from app.config import MAP_CACHE_CONTROL, PNG_COMPRESS_LEVEL
+from app.services.raster_service import (
+    load_lulc, load_change, load_confidence, lulc_path, change_path, confidence_path
+)
 from app.services.image_service import create_lulc_image, create_change_image, create_confidence_image
+from app.services.executor import single_flight, run_raster_task
+from app.services.render_cache import render_cache, render_etag, etag_matches
+from app.services.tile_service import render_tile
+from app.routes.instrumented import InstrumentedRoute
 
-router = APIRouter()
+router = APIRouter(route_class=InstrumentedRoute)
 
 # Spatial bounds for Tirupati rasters (extracted from TIFF metadata)
 # Format: [ [lat_min, lon_min], [lat_max, lon_max] ] for Leaflet
 MAP_BOUNDS = [[13.2934492, 78.9805086], [14.2662349, 80.2686029]]
 
+def _etag(layer, source, params):
+    return render_etag(layer, source(), (*params, PNG_COMPRESS_LEVEL))
+
+async def _png_response(request: Request, layer: str, source, params, render):
+    """
+    Serve a rendered PNG through the render cache. The ETag only depends on
+    the source file fingerprint and render parameters, so conditional
+    requests are answered with 304 without reading the raster. Resolving
+    source() and its fingerprint (which may revalidate the catalog) and
+    rendering both run on the raster pool, and concurrent requests for the
+    same image share one render.
+    """
+    etag = await run_raster_task(_etag, layer, source, params)
+    headers = {"ETag": etag, "Cache-Control": MAP_CACHE_CONTROL}
+
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+
+    img_bytes = await single_flight.run(("render", etag), render_cache.get, etag, render)
+    return Response(content=img_bytes, media_type="image/png", headers=headers)
+
 @router.get("/bounds")
 def get_bounds():
     """Return the spatial bounds for the rasters."""
     return {"bounds": MAP_BOUNDS}
 
+# Optional target resolution (longest side, pixels) for full-raster overlays;
+# reduced reads are served from the raster's overviews
+MaxSize = Query(None, ge=16, le=32768)
+
 @router.get("/lulc/{year}")
-async def get_lulc_map(year: int):
+async def get_lulc_map(year: int, request: Request, max_size: Optional[int] = MaxSize):
     """Return a color-coded PNG for LULC of a specific year."""
     try:
-        data = load_lulc(year)
-        img_bytes = create_lulc_image(data)
-        return Response(content=img_bytes, media_type="image/png")
+        return await _png_response(
+            request, "lulc", lambda: lulc_path(year), (max_size,),
+            lambda: create_lulc_image(load_lulc(year, max_size))
+        )
     except Exception as e:
         raise HTTPException(status_code=404, detail=str(e))
 
 @router.get("/change/{start}/{end}")
-async def get_change_map(start: int, end: int):
+async def get_change_map(start: int, end: int, request: Request, max_size: Optional[int] = MaxSize):
     """Return a red-themed change overlay PNG for a year range."""
     try:
-        data = load_change(start, end)
-        img_bytes = create_change_image(data)
-        return Response(content=img_bytes, media_type="image/png")
+        return await _png_response(
+            request, "change", lambda: change_path(start, end), (max_size,),
+            lambda: create_change_image(load_change(start, end, max_size))
+        )
     except Exception as e:
         raise HTTPException(status_code=404, detail=str(e))
 
 @router.get("/confidence/{year}")
-async def get_confidence_map(year: int):
+async def get_confidence_map(year: int, request: Request, max_size: Optional[int] = MaxSize):
     """Return a heat-map PNG for classification confidence."""
     try:
-        data, _ = load_confidence(year)
-        img_bytes = create_confidence_image(data)
-        return Response(content=img_bytes, media_type="image/png")
+        return await _png_response(
+            request, "confidence", lambda: confidence_path(year), (max_size,),
+            lambda: create_confidence_image(load_confidence(year, max_size)[0])
+        )
+    except Exception as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+def _tile_source(layer: str, year: Optional[int], start: Optional[int], end: Optional[int]):
+    """Resolve a tile layer name and its year parameters to (path, renderer)."""
+    if layer == "lulc" and year is not None:
+        return lulc_path(year), create_lulc_image
+    if layer == "confidence" and year is not None:
+        return confidence_path(year), create_confidence_image
+    if layer == "change" and start is not None and end is not None:
+        return change_path(start, end), create_change_image
+    raise ValueError(
+        "Unknown tile layer or missing parameters: use lulc?year=, "
+        "confidence?year= or change?start=&end="
+    )
+
+@router.get("/tiles/{layer}/{z}/{x}/{y}.png")
+async def get_tile(
+    layer: str,
+    z: int,
+    x: int,
+    y: int,
+    request: Request,
+    year: Optional[int] = None,
+    start: Optional[int] = None,
+    end: Optional[int] = None,
+):
+    """Return a 256x256 Web Mercator XYZ tile for the lulc, change or confidence layer."""
+    try:
+        path, create_image = await run_raster_task(_tile_source, layer, year, start, end)
+        return await _png_response(
+            request, f"tile:{layer}", lambda: path, (z, x, y),
+            lambda: render_tile(path, z, x, y, create_image)
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=404, detail=str(e))
@@ -0,0 +1,43 @@
+from fastapi import APIRouter, HTTPException, Query
+from app.constants import LULC_CLASSES
+from app.services.cube_service import get_cube
+from app.services.executor import on_raster_pool
+from app.routes.instrumented import InstrumentedRoute
+
+router = APIRouter(route_class=InstrumentedRoute)
+
+@router.get("")
+@on_raster_pool
+def pixel_trajectory(
+    lat: float = Query(..., ge=-90, le=90),
+    lon: float = Query(..., ge=-180, le=180)
+):
+    """Class and confidence of one location for every available year."""
+    try:
+        cube = get_cube()
+    except ValueError as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    if cube is None:
+        raise HTTPException(status_code=404, detail="No LULC rasters available")
+
+    index = cube.index(lat, lon)
+    if index is None:
+        raise HTTPException(status_code=404, detail="Point is outside the raster extent")
+    row, col = index
+
+    trajectory = [
+        {
+            "year": year,
+            "class_code": code,
+            "class_name": LULC_CLASSES.get(code) if code is not None else None,
+            "confidence": conf
+        }
+        for year, code, conf in cube.trajectory(row, col)
+    ]
+    return {
+        "lat": lat,
+        "lon": lon,
+        "row": row,
+        "col": col,
+        "trajectory": trajectory
+    }
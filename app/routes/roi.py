@@ -0,0 +1,87 @@
+from typing import Any, Dict, List, Optional, Tuple
+from fastapi import APIRouter, HTTPException
+from pydantic import BaseModel
+from rasterio.errors import WindowError
+from app.services.raster_service import lulc_path, confidence_path
+from app.services.roi_service import RegionOfInterest, parse_geometries, bbox_geometry
+from app.services.catalog import catalog
+from app.services.executor import on_raster_pool
+from app.routes.instrumented import InstrumentedRoute
+
+router = APIRouter(route_class=InstrumentedRoute)
+
+class ROIRequest(BaseModel):
+    """
+    Region of interest in WGS84: a GeoJSON geometry, Feature or
+    FeatureCollection, or a [min_lon, min_lat, max_lon, max_lat] bbox.
+    """
+    geometry: Optional[Dict[str, Any]] = None
+    bbox: Optional[Tuple[float, float, float, float]] = None
+    years: List[int] = []
+    pairs: List[Tuple[int, int]] = []
+    confidence_years: List[int] = []
+
+def _require(path):
+    if catalog.info(path) is None:
+        raise HTTPException(status_code=404, detail=f"Raster file not found: {path}")
+    return path
+
+@router.post("/stats")
+@on_raster_pool
+def roi_stats(request: ROIRequest):
+    """
+    Area, transition and confidence statistics for an arbitrary region.
+    Only the pixel window covering the region is read.
+    """
+    if (request.geometry is None) == (request.bbox is None):
+        raise HTTPException(status_code=400, detail="Provide exactly one of 'geometry' or 'bbox'")
+    if not (request.years or request.pairs or request.confidence_years):
+        raise HTTPException(
+            status_code=400,
+            detail="Request at least one of 'years', 'pairs' or 'confidence_years'"
+        )
+
+    try:
+        geometries = (
+            [bbox_geometry(request.bbox)] if request.bbox is not None
+            else parse_geometries(request.geometry)
+        )
+    except (KeyError, ValueError) as e:
+        raise HTTPException(status_code=400, detail=f"Invalid GeoJSON: {e}")
+    if not geometries:
+        raise HTTPException(status_code=400, detail="GeoJSON contains no geometry")
+
+    try:
+        conf_paths = {year: confidence_path(year) for year in request.confidence_years}
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    lulc_years = set(request.years) | {y for pair in request.pairs for y in pair}
+    paths = [_require(lulc_path(y)) for y in sorted(lulc_years)]
+    paths += [_require(p) for p in conf_paths.values()]
+
+    try:
+        roi = RegionOfInterest(paths[0], geometries)
+    except WindowError:
+        raise HTTPException(status_code=400, detail="Region of interest does not overlap the rasters")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid geometry: {e}")
+
+    try:
+        return {
+            "pixel_count": roi.pixel_count,
+            "window": {
+                "col_off": int(roi.window.col_off),
+                "row_off": int(roi.window.row_off),
+                "width": int(roi.window.width),
+                "height": int(roi.window.height)
+            },
+            "lulc": {str(y): roi.area_stats(lulc_path(y)) for y in request.years},
+            "change": {
+                f"{a}-{b}": roi.change_stats(lulc_path(a), lulc_path(b))
+                for a, b in request.pairs
+            },
+            "confidence": {str(y): roi.confidence_stats(p) for y, p in conf_paths.items()}
+        }
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
@@ -0,0 +1,120 @@
+import os
+from fastapi import APIRouter, HTTPException
+from app.config import ZONES_PATH
+from app.constants import LULC_CLASSES
+from app.services.analytics_service import area_stats_from_counts, change_stats_from_counts
+from app.services.raster_service import raster_info, lulc_path, confidence_path
+from app.services.zonal_service import (
+    load_zones, zone_labels, zone_class_counts, zone_transition_counts, zone_confidence
+)
+from app.services.catalog import catalog
+from app.services.executor import on_raster_pool
+from app.routes.instrumented import InstrumentedRoute
+
+router = APIRouter(route_class=InstrumentedRoute)
+
+def _require(*paths):
+    if not os.path.exists(ZONES_PATH):
+        raise HTTPException(status_code=404, detail=f"Boundary file not found: {ZONES_PATH}")
+    for path in paths:
+        if catalog.info(path) is None:
+            raise HTTPException(status_code=404, detail=f"Raster file not found: {path}")
+
+def _zone_rows(names, rows, build):
+    """One entry per zone (label 1..Z); row 0 (outside all zones) is skipped."""
+    return [
+        {"zone_id": z, "name": names[z - 1], **build(rows[z])}
+        for z in range(1, len(names) + 1)
+    ]
+
+@router.get("")
+@on_raster_pool
+def list_zones():
+    """Zones of the configured boundary layer."""
+    _require()
+    _, names = load_zones()
+    return {
+        "source": os.path.basename(ZONES_PATH),
+        "zones": [{"zone_id": z, "name": name} for z, name in enumerate(names, start=1)]
+    }
+
+@router.get("/lulc/{year}")
+@on_raster_pool
+def zone_lulc(year: int):
+    """Class areas per zone."""
+    path = lulc_path(year)
+    _require(path)
+    nodata = raster_info(path)["nodata"]
+    _, names = load_zones()
+
+    counts = zone_class_counts(
+        zone_labels(path), path, 0 if nodata is None else nodata, len(names)
+    )
+    return {
+        "year": year,
+        "zones": _zone_rows(names, counts, area_stats_from_counts)
+    }
+
+@router.get("/change/{start_year}/{end_year}")
+@on_raster_pool
+def zone_change(start_year: int, end_year: int):
+    """Transition matrices per zone."""
+    old_path, new_path = lulc_path(start_year), lulc_path(end_year)
+    _require(old_path, new_path)
+    old_nodata = raster_info(old_path)["nodata"]
+    _, names = load_zones()
+
+    try:
+        counts = zone_transition_counts(
+            zone_labels(old_path), old_path, new_path,
+            0 if old_nodata is None else old_nodata, len(names)
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {
+        "period": f"{start_year}-{end_year}",
+        "zones": _zone_rows(names, counts, change_stats_from_counts)
+    }
+
+@router.get("/confidence/{year}")
+@on_raster_pool
+def zone_confidence_stats(year: int):
+    """Mean confidence per zone, overall and per LULC class."""
+    try:
+        conf_file = confidence_path(year)
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    path = lulc_path(year)
+    _require(path, conf_file)
+    nodata = raster_info(path)["nodata"]
+    _, names = load_zones()
+
+    try:
+        counts, sums = zone_confidence(
+            zone_labels(path), path, conf_file, 0 if nodata is None else nodata, len(names)
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    def _mean(count, total):
+        return round(float(total / count), 2) if count else None
+
+    def _build(z):
+        # Last bin holds invalid pixels
+        valid_count, valid_sum = counts[z, :-1].sum(), sums[z, :-1].sum()
+        return {
+            "mean_confidence": _mean(valid_count, valid_sum),
+            "pixel_count": int(valid_count),
+            "by_class": {
+                name: {
+                    "mean_confidence": _mean(counts[z, i], sums[z, i]),
+                    "pixel_count": int(counts[z, i])
+                }
+                for i, name in enumerate(LULC_CLASSES.values())
+            }
+        }
+
+    return {
+        "year": year,
+        "zones": _zone_rows(names, range(len(counts)), _build)
+    }
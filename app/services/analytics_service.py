@@ -1,22 +1,163 @@
 import numpy as np
 from app.constants import LULC_CLASSES
+from app.services.metrics import timed
 
-def area_stats(lulc_array, pixel_size=10):
+# --------------------------------------------------
+# Class encoding / transition engine
+# --------------------------------------------------
+# Every raster is mapped once onto a compact bin index:
+#   0 .. K-1 -> LULC classes (in LULC_CLASSES order)
+#   K        -> unknown class code (present in raster, not in LULC_CLASSES)
+#   K + 1    -> nodata
+# Transitions are then counted with a single bincount over old * B + new,
+# where B = K + 2 is the number of bins per axis.
+
+def class_bins(classes):
+    """Bins per axis, B = K + 2 (classes, unknown code, nodata)."""
+    return len(classes) + 2
+
+
+@timed("encode")
+def encode_classes(arr, classes=LULC_CLASSES, nodata=0):
+    """
+    Map a class raster onto bin indices (see module notes above).
+    Returns a uint8 array of the same shape.
+    """
+    arr = np.asarray(arr)
+    class_ids = np.fromiter(classes.keys(), dtype=np.int64)
+    k = len(class_ids)
+
+    if nodata is not None and np.isnan(nodata):
+        nodata = None if arr.dtype.kind in "ui" else np.nan
+
+    if arr.dtype.kind in "ui":
+        # Lookup table spanning the observed value range, so the gather is a
+        # single pass. Unsigned rasters index the table directly.
+        lo = 0 if arr.dtype.kind == "u" else int(min(arr.min(initial=0), class_ids.min()))
+        hi = int(max(arr.max(initial=0), class_ids.max()))
+        if nodata is not None:
+            lo, hi = min(lo, int(nodata)), max(hi, int(nodata))
+
+        lut = np.full(hi - lo + 1, k, dtype=np.uint8)
+        if nodata is not None:
+            lut[int(nodata) - lo] = k + 1
+        lut[class_ids - lo] = np.arange(k, dtype=np.uint8)
+
+        if lo == 0:
+            return lut[arr]
+        return lut[arr.astype(np.int64) - lo]
+
+    # Floating point rasters: exact match against the class ids
+    pos = np.searchsorted(class_ids, arr).clip(0, k - 1)
+    index = np.where(class_ids[pos] == arr, pos, k).astype(np.uint8)
+    if nodata is not None:
+        index[np.isnan(arr) if np.isnan(nodata) else (arr == nodata)] = k + 1
+    return index
+
+
+@timed("count")
+def class_counts(lulc_array, classes=LULC_CLASSES, nodata=0, encoded=False):
+    """
+    Pixel counts per bin (K classes, unknown, nodata) in one bincount pass.
+    Pass encoded=True if lulc_array is already the output of encode_classes.
+    """
+    index = lulc_array if encoded else encode_classes(lulc_array, classes, nodata)
+    return np.bincount(index.ravel(), minlength=class_bins(classes))
+
+
+@timed("count")
+def transition_counts(old_lulc, new_lulc, classes=LULC_CLASSES, nodata=0, encoded=False):
+    """
+    Full (K+2) x (K+2) transition count matrix (row=from, col=to) from a
+    single bincount over the encoded pair. The last two rows/columns hold
+    unknown-class and nodata pixels.
+    """
+    if np.shape(old_lulc) != np.shape(new_lulc):
+        raise ValueError(
+            f"LULC rasters differ in shape: {np.shape(old_lulc)} vs {np.shape(new_lulc)}"
+        )
+
+    b = class_bins(classes)
+    old_idx = old_lulc if encoded else encode_classes(old_lulc, classes, nodata)
+    new_idx = new_lulc if encoded else encode_classes(new_lulc, classes, nodata)
+
+    # B*B fits in uint8 for up to 14 classes; widen otherwise
+    code_dtype = np.uint8 if b * b <= 256 else np.uint16
+    code = old_idx.astype(code_dtype)
+    code *= b
+    code += new_idx
+
+    return np.bincount(code.ravel(), minlength=b * b).reshape(b, b)
+
+
+# --------------------------------------------------
+# Transition-coded change rasters
+# --------------------------------------------------
+# Change rasters written by src/change.py store from * 10 + to for every
+# valid pixel (class codes 1-9, so 11 .. 99) and 0 for nodata. Legacy change
+# rasters store 0 = unchanged, 1 = changed; both decode through changed_mask.
+TRANSITION_BASE = 10
+
+
+def transition_code_lut(classes=LULC_CLASSES):
+    """
+    uint8 table mapping an encoded pair (old_bin * B + new_bin, see
+    transition_counts) to its from * 10 + to code. Pairs involving unknown
+    or nodata bins map to 0.
+    """
+    class_ids = np.fromiter(classes.keys(), dtype=np.int64)
+    if class_ids.min() < 1 or class_ids.max() >= TRANSITION_BASE:
+        raise ValueError(
+            f"Transition codes need class codes 1-{TRANSITION_BASE - 1}, got {class_ids.tolist()}"
+        )
+
+    b = class_bins(classes)
+    k = len(class_ids)
+    lut = np.zeros((b, b), dtype=np.uint8)
+    lut[:k, :k] = class_ids[:, None] * TRANSITION_BASE + class_ids[None, :]
+    return lut.ravel()
+
+
+def changed_values(values):
+    """Changed flag per change raster value (legacy 0/1 or transition code)."""
+    values = np.asarray(values)
+    from_class, to_class = np.divmod(values, TRANSITION_BASE)
+    return np.where(values >= TRANSITION_BASE, from_class != to_class, values != 0)
+
+
+_CHANGED_U8 = changed_values(np.arange(256))
+
+
+def changed_mask(change):
+    """Boolean changed/unchanged mask of a change raster (see changed_values)."""
+    change = np.asarray(change)
+    if change.dtype == np.uint8:
+        return _CHANGED_U8[change]
+    return changed_values(change)
+
+
+# --------------------------------------------------
+# Payload builders
+# --------------------------------------------------
+@timed("payload")
+def area_stats_from_counts(counts, classes=LULC_CLASSES, pixel_size=10):
+    """Build the /lulc payload from class_counts output."""
     pixel_area_ha = (pixel_size * pixel_size) / 10000
-    total_pixels = lulc_array.size
-    valid_pixels = (lulc_array != 0).sum() # Assuming 0 is nodata
-    
+    k = len(classes)
+    # Unknown codes count towards the valid area, only nodata is excluded
+    valid_pixels = int(counts[:k + 1].sum())
+
     if valid_pixels == 0:
         return {"total_area_ha": 0, "stats": []}
 
     total_area = valid_pixels * pixel_area_ha
     stats = []
 
-    for cls, name in LULC_CLASSES.items():
-        pixel_count = (lulc_array == cls).sum()
+    for i, name in enumerate(classes.values()):
+        pixel_count = int(counts[i])
         area = pixel_count * pixel_area_ha
-        percentage = (pixel_count / valid_pixels) * 100 if valid_pixels > 0 else 0
-        
+        percentage = (pixel_count / valid_pixels) * 100
+
         stats.append({
             "class_name": name,
             "area_ha": round(area, 2),
@@ -29,38 +170,25 @@ def area_stats(lulc_array, pixel_size=10):
     }
 
 
-def change_stats(old_lulc, new_lulc, pixel_size=10):
+@timed("payload")
+def change_stats_from_counts(counts, classes=LULC_CLASSES, pixel_size=10):
+    """Build the /change payload from transition_counts output."""
     pixel_area_ha = (pixel_size * pixel_size) / 10000
-    
-    # Initialize matrix (5x5 for 5 classes)
-    # LULC_CLASSES keys are 1-5, so we need to map to 0-4 indices or just use list
-    num_classes = len(LULC_CLASSES)
-    matrix = np.zeros((num_classes, num_classes))
-    
+    k = len(classes)
+    names = list(classes.values())
+
+    # Fill matrix (row=from, col=to)
+    matrix = np.round(counts[:k, :k] * pixel_area_ha, 2)
+
     breakdown = []
-    
-    # Calculate transitions
-    for i, (cls_i, name_i) in enumerate(LULC_CLASSES.items()):
-        for j, (cls_j, name_j) in enumerate(LULC_CLASSES.items()):
-            # Count pixels transitioning from class i to class j
-            mask = (old_lulc == cls_i) & (new_lulc == cls_j)
-            count = mask.sum()
-            area = count * pixel_area_ha
-            
-            # Fill matrix (row=from, col=to)
-            matrix[i, j] = round(area, 2)
-            
-            if count > 0:
-                breakdown.append({
-                    "from_class": name_i,
-                    "to_class": name_j,
-                    "area_ha": round(area, 2)
-                })
-
-    # Normalize matrix to percentages for frontend heatmap if needed, 
-    # but usually raw area or row-normalized is better. 
-    # Let's provide row-normalized (percentage of "from" class)
-    matrix_normalized = np.zeros_like(matrix)
+    for i, j in zip(*np.nonzero(counts[:k, :k])):
+        breakdown.append({
+            "from_class": names[i],
+            "to_class": names[j],
+            "area_ha": float(matrix[i, j])
+        })
+
+    # Row-normalized (percentage of "from" class)
     row_sums = matrix.sum(axis=1)
     with np.errstate(divide='ignore', invalid='ignore'):
         matrix_normalized = (matrix.T / row_sums).T * 100
@@ -71,3 +199,15 @@ def change_stats(old_lulc, new_lulc, pixel_size=10):
         "matrix_percentage": np.round(matrix_normalized, 1).tolist(),
         "breakdown": breakdown
     }
+
+
+def area_stats(lulc_array, pixel_size=10, nodata=0):
+    return area_stats_from_counts(
+        class_counts(lulc_array, nodata=nodata), pixel_size=pixel_size
+    )
+
+
+def change_stats(old_lulc, new_lulc, pixel_size=10, nodata=0):
+    return change_stats_from_counts(
+        transition_counts(old_lulc, new_lulc, nodata=nodata), pixel_size=pixel_size
+    )
@@ -0,0 +1,98 @@
+import json
+import os
+from pathlib import Path
+
+import numpy as np
+import rasterio
+
+from app.config import DATA_DIR, ARRAY_STORE_DIR
+from app.services.raster_cache import file_signature, file_hash
+from app.services.compact import narrow_uint8
+
+# Each raster band is stored as an uncompressed .npy file (64-byte aligned
+# header, C order) next to a small JSON header with the georeferencing and
+# the fingerprint of the source GeoTIFF. Opening it with mmap_mode='r'
+# needs no decoding, and every worker process shares the same page-cached
+# copy.
+
+STORE_VERSION = 1
+
+
+def store_paths(raster_path):
+    """(array path, header path) of a raster's store entry."""
+    relative = Path(os.path.relpath(raster_path, DATA_DIR)).with_suffix("")
+    base = ARRAY_STORE_DIR / relative
+    return base.with_suffix(".npy"), base.with_suffix(".json")
+
+
+def write_array(raster_path):
+    """Decode a single-band raster once and write its store entry."""
+    array_path, header_path = store_paths(raster_path)
+    array_path.parent.mkdir(parents=True, exist_ok=True)
+
+    with rasterio.open(raster_path) as src:
+        data = narrow_uint8(src.read(1), src.nodata)
+        header = {
+            "version": STORE_VERSION,
+            "shape": list(data.shape),
+            "dtype": str(data.dtype),
+            "nodata": src.nodata,
+            "transform": list(src.transform)[:6],
+            "crs": src.crs.to_wkt() if src.crs else None,
+        }
+
+    mtime_ns, size = file_signature(raster_path)
+    header["source"] = {
+        "path": os.path.relpath(raster_path, DATA_DIR),
+        "mtime_ns": mtime_ns,
+        "size": size,
+        "sha256": file_hash(raster_path),
+    }
+
+    tmp = array_path.with_suffix(f".{os.getpid()}.tmp.npy")
+    np.save(tmp, np.ascontiguousarray(data))
+    os.replace(tmp, array_path)
+    with open(header_path, "w") as f:
+        json.dump(header, f)
+    return array_path
+
+
+def read_header(raster_path):
+    """Store header of a raster, or None if there is no entry."""
+    _, header_path = store_paths(raster_path)
+    try:
+        with open(header_path) as f:
+            header = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return header if header.get("version") == STORE_VERSION else None
+
+
+def is_current(raster_path, header=None):
+    """True if the store entry matches the current source GeoTIFF."""
+    header = header or read_header(raster_path)
+    if header is None:
+        return False
+    source = header["source"]
+    mtime_ns, size = file_signature(raster_path)
+    if (mtime_ns, size) == (source["mtime_ns"], source["size"]):
+        return True
+    return size == source["size"] and file_hash(raster_path) == source["sha256"]
+
+
+def open_array(raster_path):
+    """
+    (memory-mapped array, nodata) for a raster with a current store entry,
+    or None so the caller falls back to decoding the GeoTIFF.
+    """
+    header = read_header(raster_path)
+    try:
+        if header is None or not is_current(raster_path, header):
+            return None
+        array_path, _ = store_paths(raster_path)
+        data = np.load(array_path, mmap_mode="r")
+    except (OSError, ValueError):
+        return None
+    if list(data.shape) != header["shape"]:
+        return None
+    return data, header["nodata"]
@@ -0,0 +1,56 @@
+from app.constants import LULC_CLASSES
+from app.services.analytics_service import (
+    encode_classes, class_counts, transition_counts,
+    area_stats_from_counts, change_stats_from_counts
+)
+from app.services.raster_service import load_lulc
+from app.services.summary_store import load_summary
+
+# A batch is answered from fresh summary sidecars where possible; every other
+# raster is loaded and encoded exactly once, and all of its area tables and
+# transition matrices are counted from that shared encoded array.
+
+def batch_analytics(years, pairs):
+    """
+    Area tables for every year (including the years of each pair),
+    transition matrices for every pair and a per-class area time series.
+    """
+    all_years = sorted(set(years).union(*pairs))
+    pairs = list(dict.fromkeys(tuple(p) for p in pairs))
+
+    areas = {y: load_summary("lulc", y) for y in all_years}
+    changes = {p: load_summary("change", *p) for p in pairs}
+
+    encoded = {}
+    def _encoded(year):
+        if year not in encoded:
+            encoded[year] = encode_classes(load_lulc(year))
+        return encoded[year]
+
+    for year, payload in areas.items():
+        if payload is None:
+            areas[year] = area_stats_from_counts(class_counts(_encoded(year), encoded=True))
+
+    for (start, end), payload in changes.items():
+        if payload is None:
+            changes[(start, end)] = change_stats_from_counts(
+                transition_counts(_encoded(start), _encoded(end), encoded=True)
+            )
+
+    series = {name: [] for name in LULC_CLASSES.values()}
+    for year in all_years:
+        # Years without valid pixels have an empty stats table
+        rows = {row["class_name"]: row for row in areas[year]["stats"]}
+        for name, points in series.items():
+            row = rows.get(name, {"area_ha": 0, "percentage": 0})
+            points.append({"year": year, "area_ha": row["area_ha"], "percentage": row["percentage"]})
+
+    return {
+        "years": all_years,
+        "lulc": [{"year": year, **areas[year]} for year in all_years],
+        "change": [
+            {"start_year": start, "end_year": end, **changes[(start, end)]}
+            for start, end in pairs
+        ],
+        "series": series
+    }
@@ -0,0 +1,174 @@
+import os
+import re
+import threading
+import time
+
+import rasterio
+from rasterio.errors import RasterioError
+
+from app.config import DATA_DIR, LULC_DIR, CHANGE_DIR, CONFIDENCE_DIR, CATALOG_TTL
+
+# In-memory index of the served rasters. The data directory is listed and
+# each file stat'ed at most once per CATALOG_TTL seconds; raster metadata is
+# only re-read for files whose fingerprint changed. Everything else (path
+# resolution, existence checks, cache fingerprints, raster_info) is answered
+# from memory.
+
+LAYER_PATTERNS = {
+    "lulc": (LULC_DIR, re.compile(r"Tirupati_LULC_(\d{4})\.tif$")),
+    "change": (CHANGE_DIR, re.compile(r"Tirupati_LULC_Change_(\d{4})_(\d{4})\.tif$")),
+    "confidence": (CONFIDENCE_DIR, re.compile(r"Tirupati_Confidence_(\d{4})\.tif$")),
+}
+
+
+def file_signature(path):
+    """(mtime_ns, size) of a file; changes whenever the file is rewritten."""
+    st = os.stat(path)
+    return st.st_mtime_ns, st.st_size
+
+
+def _describe(path):
+    with rasterio.open(path) as src:
+        return {
+            "shape": src.shape,
+            "nodata": src.nodata,
+            "dtype": src.dtypes[0],
+            "block_shape": src.block_shapes[0],
+            "transform": src.transform,
+            "crs": src.crs,
+            "overviews": src.overviews(1),
+        }
+
+
+class DatasetCatalog:
+    """Layers keyed by (kind, *years), e.g. ("change", 2019, 2024)."""
+
+    def __init__(self, ttl=CATALOG_TTL):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._layers = {}
+        self._by_path = {}
+        self._checked_at = None
+        self.scanned_at = None
+        self.scans = 0
+
+    def _stale(self):
+        return self._checked_at is None or time.monotonic() - self._checked_at >= self.ttl
+
+    def refresh(self, force=False):
+        """Revalidate against the data directory if the TTL has passed."""
+        if not force and not self._stale():
+            return
+        with self._lock:
+            if not force and not self._stale():
+                return
+
+            layers = {}
+            for kind, (directory, pattern) in LAYER_PATTERNS.items():
+                try:
+                    names = sorted(os.listdir(directory))
+                except OSError:
+                    continue
+                for name in names:
+                    match = pattern.match(name)
+                    if not match:
+                        continue
+                    key = (kind, *(int(g) for g in match.groups()))
+                    path = directory / name
+                    try:
+                        signature = file_signature(path)
+                        previous = self._layers.get(key)
+                        if previous is not None and previous["signature"] == signature:
+                            layers[key] = previous
+                            continue
+                        layers[key] = {
+                            "kind": kind,
+                            "years": key[1:],
+                            "path": path,
+                            "signature": signature,
+                            **_describe(path),
+                        }
+                    except (OSError, RasterioError):
+                        # Vanished or unreadable (e.g. mid-write); retried next scan
+                        continue
+
+            self._layers = layers
+            self._by_path = {str(r["path"]): r for r in layers.values()}
+            self._checked_at = time.monotonic()
+            self.scanned_at = time.time()
+            self.scans += 1
+
+    def get(self, kind, *years):
+        """Layer record, or None if the layer is not on disk."""
+        self.refresh()
+        return self._layers.get((kind, *years))
+
+    def path(self, kind, *years):
+        """Path of a layer; raises FileNotFoundError listing what is available."""
+        record = self.get(kind, *years)
+        if record is None:
+            label = "-".join(str(y) for y in years)
+            raise FileNotFoundError(
+                f"{kind} data not available for {label}. "
+                f"Available: {[list(k) if len(k) > 1 else k[0] for k in self.keys(kind)]}"
+            )
+        return record["path"]
+
+    def keys(self, kind):
+        """Sorted year keys of a kind: (year,) or (start, end) tuples."""
+        self.refresh()
+        return sorted(key[1:] for key in self._layers if key[0] == kind)
+
+    def years(self, kind):
+        """Sorted single years of a kind (lulc / confidence)."""
+        return [key[0] for key in self.keys(kind)]
+
+    def info(self, path):
+        """Layer record of a path, or None if it is not a catalogued layer."""
+        self.refresh()
+        return self._by_path.get(str(path))
+
+    def layers(self):
+        self.refresh()
+        return [self._layers[key] for key in sorted(self._layers)]
+
+    def describe(self, hashes=True):
+        """JSON-safe listing served at /catalog."""
+        from app.services.raster_cache import file_hash
+
+        result = []
+        for record in self.layers():
+            mtime_ns, size = record["signature"]
+            entry = {
+                "kind": record["kind"],
+                "years": list(record["years"]),
+                "path": os.path.relpath(record["path"], DATA_DIR),
+                "shape": list(record["shape"]),
+                "dtype": record["dtype"],
+                "nodata": record["nodata"],
+                "block_shape": list(record["block_shape"]),
+                "overviews": list(record["overviews"]),
+                "transform": list(record["transform"])[:6],
+                "crs": record["crs"].to_string() if record["crs"] else None,
+                "size": size,
+                "mtime_ns": mtime_ns,
+            }
+            if hashes:
+                entry["sha256"] = file_hash(record["path"])
+            result.append(entry)
+        return {
+            "data_dir": str(DATA_DIR),
+            "scanned_at": self.scanned_at,
+            "layers": result,
+        }
+
+
+catalog = DatasetCatalog()
+
+
+def layer_signature(path):
+    """Fingerprint of a file: from the catalog for layers, otherwise stat'ed."""
+    record = catalog.info(path)
+    if record is not None:
+        return record["signature"]
+    return file_signature(path)
@@ -0,0 +1,105 @@
+import numpy as np
+
+# Compact in-memory raster forms: class/confidence rasters narrowed to uint8
+# and boolean masks packed 8 pixels per byte. Both are what the raster cache
+# holds, so more layers fit in RASTER_CACHE_BYTES.
+
+def narrow_uint8(data, nodata=None):
+    """
+    data as uint8 when that is lossless: every value (and nodata) is a whole
+    number in 0-255. Anything else (NaN, fractions, negative or wide codes)
+    is returned unchanged.
+    """
+    data = np.asarray(data)
+    if data.dtype == np.uint8 or data.dtype.kind not in "uif":
+        return data
+    if nodata is not None and not (float(nodata).is_integer() and 0 <= nodata <= 255):
+        return data
+    if data.size == 0:
+        return data.astype(np.uint8)
+
+    # NaN propagates through min/max and fails both comparisons
+    lo, hi = data.min(), data.max()
+    if not (lo >= 0 and hi <= 255):
+        return data
+
+    narrowed = data.astype(np.uint8)
+    if data.dtype.kind == "f" and not np.array_equal(narrowed, data):
+        return data
+    return narrowed
+
+
+# Set bits per byte value, for numpy versions without np.bitwise_count
+_POPCOUNT = np.unpackbits(np.arange(256, dtype=np.uint8)[:, None], axis=1).sum(axis=1)
+
+
+def popcount(bits):
+    """Total number of set bits in a uint8 array."""
+    if hasattr(np, "bitwise_count"):
+        return int(np.bitwise_count(bits).sum(dtype=np.int64))
+    return int(_POPCOUNT[bits].sum(dtype=np.int64))
+
+
+class PackedMask:
+    """
+    Boolean raster mask packed 8 pixels per byte along each row, so row
+    ranges unpack independently. Padding bits at the end of each row are
+    always 0, so counts never see them.
+    """
+
+    def __init__(self, bits, shape):
+        self.bits = bits
+        self.bits.setflags(write=False)
+        self.shape = tuple(shape)
+
+    @classmethod
+    def from_array(cls, mask):
+        mask = np.asarray(mask, dtype=bool)
+        return cls(np.packbits(mask, axis=1), mask.shape)
+
+    @classmethod
+    def from_rows(cls, row_masks, width):
+        """Pack a stream of full-width row blocks without a full-size bool array."""
+        packed = [np.packbits(np.asarray(m, dtype=bool), axis=1) for m in row_masks]
+        if not packed:
+            return cls(np.zeros((0, (width + 7) // 8), dtype=np.uint8), (0, width))
+        bits = np.concatenate(packed)
+        return cls(bits, (bits.shape[0], width))
+
+    @property
+    def nbytes(self):
+        return self.bits.nbytes
+
+    def count(self):
+        """Number of True pixels."""
+        return popcount(self.bits)
+
+    def count_and(self, other):
+        """Number of pixels True in both masks."""
+        self._check(other)
+        return popcount(self.bits & other.bits)
+
+    def __and__(self, other):
+        self._check(other)
+        return PackedMask(self.bits & other.bits, self.shape)
+
+    def __or__(self, other):
+        self._check(other)
+        return PackedMask(self.bits | other.bits, self.shape)
+
+    def __invert__(self):
+        bits = ~self.bits
+        # Keep the row padding cleared
+        tail = self.shape[1] % 8
+        if tail:
+            bits[:, -1] &= np.uint8((0xFF << (8 - tail)) & 0xFF)
+        return PackedMask(bits, self.shape)
+
+    def unpack(self, row_start=0, row_stop=None):
+        """Boolean array of rows row_start:row_stop."""
+        rows = self.bits[row_start:row_stop]
+        return np.unpackbits(rows, axis=1, count=self.shape[1]).view(bool)
+
+    def _check(self, other):
+        if self.shape != other.shape:
+            raise ValueError(f"Mask shapes differ: {self.shape} vs {other.shape}")
@@ -0,0 +1,298 @@
+from functools import lru_cache
+import numpy as np
+from app.constants import LULC_CLASSES
+from app.services.analytics_service import encode_classes
+from app.services.catalog import layer_signature
+from app.services.metrics import timed
+from app.services.raster_service import iter_windows, iter_rows, load_mask
+
+# All statistics below are computed by streaming raster windows through
+# running accumulators (see raster_service.iter_windows), so no full-size
+# masks or copies are created. Confidence value 0 represents
+# nodata/background.
+
+def _add_counts(hist, counts):
+    """Add a bincount result into a running histogram, growing it as needed."""
+    if counts.size > hist.size:
+        counts[:hist.size] += hist
+        return counts
+    hist[:counts.size] += counts
+    return hist
+
+# Float confidence is binned on a fixed-point grid of 1 / FLOAT_SCALE
+FLOAT_SCALE = 100
+
+class ValueHistogram:
+    """
+    Exact distribution of non-negative integer bins as per-bin counts; bin b
+    stands for the value b / scale.
+
+    Percentiles are read off the cumulative counts with the same linear
+    interpolation as np.percentile, so no pixel copy or sort is needed.
+    """
+
+    def __init__(self, counts=None, scale=1):
+        self.counts = np.zeros(0, dtype=np.int64) if counts is None else np.asarray(counts, dtype=np.int64)
+        self.scale = scale
+
+    def _value(self, b):
+        return b if self.scale == 1 else b / self.scale
+
+    def add(self, counts):
+        """Accumulate a bincount result."""
+        self.counts = _add_counts(self.counts, np.asarray(counts, dtype=np.int64))
+
+    def update(self, values):
+        """Accumulate an array of non-negative integer values."""
+        self.add(np.bincount(np.ravel(values)))
+
+    @property
+    def total(self):
+        return int(self.counts.sum())
+
+    def min(self):
+        return self._value(int(np.flatnonzero(self.counts)[0]))
+
+    def max(self):
+        return self._value(int(np.flatnonzero(self.counts)[-1]))
+
+    def sum(self):
+        return float(np.dot(np.arange(self.counts.size, dtype=np.float64), self.counts)) / self.scale
+
+    def percentile(self, q):
+        """q-th percentile (0-100) of the accumulated values."""
+        n = self.total
+        if n == 0:
+            return None
+        cumulative = np.cumsum(self.counts)
+        position = q / 100 * (n - 1)
+        below = int(np.floor(position))
+        lower = int(np.searchsorted(cumulative, below + 1))
+        upper = int(np.searchsorted(cumulative, min(below + 2, n)))
+        return self._value(lower + (upper - lower) * (position - below))
+
+    def median(self):
+        return self.percentile(50)
+
+    def value_range(self):
+        """(min, max + one bin) of the values, the default histogram range."""
+        return self.min(), self.max() + 1 / self.scale
+
+    def binned(self, bins=10, value_range=None):
+        """Equal-width histogram of the values over value_range (default: min..max)."""
+        values = np.arange(self.counts.size) / self.scale
+        if value_range is None and self.total:
+            value_range = self.value_range()
+        counts, edges = np.histogram(values, bins=bins, range=value_range, weights=self.counts)
+        return {
+            "edges": [round(float(e), 2) for e in edges],
+            "counts": [int(c) for c in counts]
+        }
+
+def value_scale(dtype):
+    """Bins per unit of confidence_values for a raster dtype."""
+    return FLOAT_SCALE if np.dtype(dtype).kind == "f" else 1
+
+def confidence_values(conf):
+    """
+    Confidence window as non-negative integer histogram bins; invalid pixels
+    (<= 0 or NaN) land in bin 0. Integer rasters are binned on their values,
+    float rasters (0-1 or 0-100) on a 1 / FLOAT_SCALE grid; validity is
+    decided before rounding, so tiny valid values still land in bin 1.
+    """
+    if conf.dtype.kind == "u":
+        return conf
+    if conf.dtype.kind == "i":
+        return np.maximum(conf, 0)
+    valid = np.isfinite(conf) & (conf > 0)
+    bins = np.rint(np.where(valid, conf, 0) * FLOAT_SCALE).astype(np.int64)
+    return np.where(valid, np.maximum(bins, 1), 0)
+
+@timed("confidence_stats")
+def summary_stats(conf_path):
+    """
+    Min/max/mean/median and coverage of the valid pixels of a confidence
+    raster. Returns None if the raster has no valid pixels.
+
+    Integer rasters are summarised exactly from a per-value histogram alone.
+    Float rasters keep exact running count/sum/min/max; their median comes
+    from the 1 / FLOAT_SCALE fixed-point histogram, i.e. it is the median of
+    the values rounded to 0.01 (and can differ from np.median when that is
+    within 0.005 of a whole number).
+    """
+    hist = None
+    total = 0
+    count, total_sum, lo, hi = 0, 0.0, None, None
+
+    for (conf,) in iter_windows([conf_path]):
+        if hist is None:
+            hist = ValueHistogram(scale=value_scale(conf.dtype))
+        total += conf.size
+        counts = np.bincount(confidence_values(conf).ravel())
+        counts[0] = 0
+        hist.add(counts)
+
+        if conf.dtype.kind == "f":
+            valid = conf[np.isfinite(conf) & (conf > 0)]
+            if valid.size:
+                count += valid.size
+                total_sum += float(valid.sum(dtype=np.float64))
+                lo = valid.min() if lo is None else min(lo, valid.min())
+                hi = valid.max() if hi is None else max(hi, valid.max())
+
+    if lo is None:
+        if hist is None or hist.total == 0:
+            return None
+        count, total_sum = hist.total, hist.sum()
+        lo, hi = hist.min(), hist.max()
+
+    median = hist.median()
+    return {
+        "min": int(lo),
+        "max": int(hi),
+        "mean": round(total_sum / count, 2),
+        "median": int(median) if median is not None else None,
+        "valid_pixels": int(count),
+        "total_pixels": int(total),
+        "coverage_percent": round((count / total) * 100, 2)
+    }
+
+@lru_cache(maxsize=16)
+@timed("confidence_histogram")
+def _value_histograms(conf_path, conf_signature, lulc_path, lulc_signature, lulc_nodata):
+    k = len(LULC_CLASSES)
+    rows = k + 2  # classes, unknown code, LULC nodata / no LULC raster
+    hist = np.zeros((rows, 0), dtype=np.int64)
+    scale = 1
+
+    paths = [conf_path] if lulc_path is None else [conf_path, lulc_path]
+    for windows in iter_windows(paths):
+        scale = value_scale(windows[0].dtype)
+        values = confidence_values(windows[0]).ravel()
+        width = max(hist.shape[1], int(values.max(initial=0)) + 1)
+        if lulc_path is None:
+            index = np.full(values.shape, k + 1, dtype=np.int64)
+        else:
+            index = encode_classes(windows[1], nodata=lulc_nodata).ravel().astype(np.int64)
+
+        counts = np.bincount(index * width + values, minlength=rows * width).reshape(rows, width)
+        counts[:, :hist.shape[1]] += hist
+        hist = counts
+
+    # Column 0 holds invalid confidence pixels
+    if hist.shape[1]:
+        hist[:, 0] = 0
+    hist.setflags(write=False)
+
+    # 0-1 float rasters are read as percentages, as the renderers do
+    nonzero = np.flatnonzero(hist.any(axis=0))
+    if scale == FLOAT_SCALE and nonzero.size and nonzero[-1] <= 1.05 * FLOAT_SCALE:
+        scale = FLOAT_SCALE / 100
+    return hist, scale
+
+def value_histograms(conf_path, lulc_path=None, lulc_nodata=None):
+    """
+    Per-value confidence counts split by LULC class, from one streaming pass.
+
+    Returns (hist, scale): hist is a (K + 2) x V read-only array whose rows
+    follow LULC_CLASSES, then unknown class codes, then pixels without a
+    LULC value; column v counts pixels with confidence v / scale (column 0,
+    invalid pixels, is zeroed). 0-1 float rasters get a scale that reads
+    them as percentages. Results are cached per source file fingerprint.
+    """
+    return _value_histograms(
+        str(conf_path), layer_signature(conf_path),
+        None if lulc_path is None else str(lulc_path),
+        None if lulc_path is None else layer_signature(lulc_path),
+        lulc_nodata
+    )
+
+def distribution(conf_path, lulc_path=None, lulc_nodata=None,
+                 percentiles=(5, 25, 50, 75, 95), bins=10):
+    """
+    Percentiles and binned histograms, overall and per LULC class: exact for
+    integer rasters, to 1 / FLOAT_SCALE for float ones.
+    """
+    hist, scale = value_histograms(conf_path, lulc_path, lulc_nodata)
+    overall = ValueHistogram(hist.sum(axis=0), scale)
+    if overall.total == 0:
+        return None
+
+    value_range = overall.value_range()
+
+    def _describe(h):
+        return {
+            "pixel_count": h.total,
+            "percentiles": {
+                f"{q:g}": round(h.percentile(q), 2) if h.total else None
+                for q in percentiles
+            },
+            "histogram": h.binned(bins, value_range)
+        }
+
+    result = _describe(overall)
+    result["by_class"] = {}
+    if lulc_path is not None:
+        for i, class_name in enumerate(LULC_CLASSES.values()):
+            result["by_class"][class_name] = _describe(ValueHistogram(hist[i], scale))
+    return result
+
+@timed("confidence_stats")
+def stats_by_class(lulc_path, conf_path, lulc_nodata=None):
+    """Mean confidence and pixel count of the valid pixels of each LULC class."""
+    k = len(LULC_CLASSES)
+    bins = k + 2  # classes, unknown code, nodata/invalid
+    counts = np.zeros(bins, dtype=np.int64)
+    sums = np.zeros(bins, dtype=np.float64)
+
+    for lulc, conf in iter_windows([lulc_path, conf_path]):
+        index = encode_classes(lulc, nodata=lulc_nodata)
+        valid = conf > 0
+        index[~valid] = k + 1
+        index = index.ravel()
+        counts += np.bincount(index, minlength=bins)
+        sums += np.bincount(index, weights=conf.ravel(), minlength=bins)
+
+    result = {}
+    for i, class_name in enumerate(LULC_CLASSES.values()):
+        result[class_name] = {
+            "mean_confidence": round(float(sums[i] / counts[i]), 2)
+            if counts[i] else None,
+            "pixel_count": int(counts[i])
+        }
+    return result
+
+@timed("confidence_stats")
+def stats_by_change(change_path, conf_path):
+    """
+    Mean confidence and pixel count of changed vs unchanged valid pixels.
+    Counts come from popcounts of the cached bit-packed masks; only the
+    confidence sums need a pass over the pixels. In transition-coded change
+    rasters 0 is nodata, so only pixels with a transition code count as
+    unchanged; in legacy 0/1 rasters every 0 pixel does.
+    """
+    changed = load_mask(change_path, "changed")
+    valid = load_mask(conf_path, "valid")
+    if changed.shape != valid.shape:
+        raise ValueError(f"Raster shapes differ: {changed.shape} vs {valid.shape}")
+    coded = load_mask(change_path, "transition")
+    if coded.count():
+        valid = valid & coded
+
+    # 0 = invalid, 1 = unchanged, 2 = changed
+    n_valid, n_changed = valid.count(), valid.count_and(changed)
+    counts = np.array([0, n_valid - n_changed, n_changed], dtype=np.int64)
+    sums = np.zeros(3, dtype=np.float64)
+
+    for row, conf in iter_rows(conf_path):
+        stop = row + conf.shape[0]
+        code = valid.unpack(row, stop).view(np.uint8) * (1 + changed.unpack(row, stop).view(np.uint8))
+        sums += np.bincount(code.ravel(), weights=conf.ravel(), minlength=3)
+
+    def _stats(i):
+        return {
+            "mean_confidence": round(float(sums[i] / counts[i]), 2) if counts[i] else None,
+            "pixel_count": int(counts[i])
+        }
+
+    return {"changed": _stats(2), "unchanged": _stats(1)}
@@ -0,0 +1,228 @@
+import hashlib
+import json
+import os
+import threading
+
+import numpy as np
+from numpy.lib.format import open_memmap
+from rasterio.crs import CRS
+from rasterio.warp import transform as transform_coords
+
+from app.config import DATA_DIR, ARRAY_STORE_DIR
+from app.services.catalog import catalog
+from app.services.raster_service import iter_rows
+
+# All LULC years stacked into one uint8 (years, H, W) cube, with the
+# confidence years alongside as uint8 percentages, so a point query is a
+# single strided gather. 0 means nodata in both cubes. The cubes live in
+# the array store as .npy files named after the fingerprints of their
+# sources: they are built once (by python -m app.ingest, the warm-up or the
+# first query) and memory-mapped by every worker, so the pixels are neither
+# decoded per request nor copied per process.
+
+CUBE_DIR = ARRAY_STORE_DIR / "cube"
+CUBE_VERSION = 1
+WGS84 = CRS.from_epsg(4326)
+
+
+def _class_codes(data, nodata, path):
+    """Class strip as uint8 with nodata mapped to 0; rejects codes outside 0-255."""
+    if data.dtype == np.uint8 and nodata in (None, 0):
+        return data
+    valid = np.isfinite(data) if data.dtype.kind == "f" else np.ones(data.shape, dtype=bool)
+    if nodata is not None:
+        valid &= data != nodata
+    if valid.any() and (data[valid].min() < 0 or data[valid].max() > 255):
+        raise ValueError(f"Class codes of {path} do not fit in uint8")
+    return np.where(valid, data, 0).astype(np.uint8)
+
+
+def _confidence_scale(path):
+    """100 for 0-1 confidence rasters (read as percentages, as the renderers do), else 1."""
+    max_val = 0
+    for _, conf in iter_rows(path):
+        finite = np.isfinite(conf) if conf.dtype.kind == "f" else True
+        max_val = max(max_val, conf.max(initial=0, where=finite))
+    return 100 if 0 < max_val <= 1.05 else 1
+
+
+def _confidence_percent(data, scale):
+    """Confidence strip as uint8 0-100 percentages, 0 = nodata."""
+    finite = np.isfinite(data) if data.dtype.kind == "f" else True
+    percent = np.clip(np.rint(data.astype(np.float64) * scale), 0, 100)
+    return np.where(finite, percent, 0).astype(np.uint8)
+
+
+def _cube_files(digest):
+    return CUBE_DIR / f"classes_{digest}.npy", CUBE_DIR / f"confidence_{digest}.npy"
+
+
+def _fill(path, out, convert):
+    """Stream a raster into one (H, W) slice of a cube."""
+    for row, strip in iter_rows(path):
+        out[row:row + strip.shape[0]] = convert(strip)
+
+
+def _save(path, shape, fill):
+    """Write a uint8 cube through a temporary memory-mapped .npy file."""
+    tmp = path.with_suffix(f".{os.getpid()}.tmp.npy")
+    cube = open_memmap(tmp, mode="w+", dtype=np.uint8, shape=shape)
+    fill(cube)
+    cube.flush()
+    del cube
+    os.replace(tmp, path)
+
+
+def write_cube(lulc, confidence, digest):
+    """
+    Build the class and confidence cubes of lulc / confidence (catalog
+    records keyed by year) into the array store, with a header recording
+    their years and confidence scales.
+    """
+    years = sorted(lulc)
+    shape = lulc[years[0]]["shape"]
+    for year in years:
+        if lulc[year]["shape"] != shape:
+            raise ValueError(
+                f"LULC rasters differ in shape: {shape} vs {lulc[year]['shape']} ({year})"
+            )
+    # Confidence only for years on the same grid as the class cube
+    confidence_years = [y for y in sorted(confidence) if confidence[y]["shape"] == shape]
+    scales = {y: _confidence_scale(confidence[y]["path"]) for y in confidence_years}
+
+    CUBE_DIR.mkdir(parents=True, exist_ok=True)
+    classes_path, confidence_path = _cube_files(digest)
+
+    def fill_classes(cube):
+        for i, year in enumerate(years):
+            record = lulc[year]
+            _fill(record["path"], cube[i], lambda d: _class_codes(d, record["nodata"], record["path"]))
+
+    def fill_confidence(cube):
+        for i, year in enumerate(confidence_years):
+            _fill(confidence[year]["path"], cube[i], lambda d: _confidence_percent(d, scales[year]))
+
+    _save(classes_path, (len(years), *shape), fill_classes)
+    _save(confidence_path, (len(confidence_years), *shape), fill_confidence)
+
+    header = {
+        "version": CUBE_VERSION,
+        "digest": digest,
+        "years": years,
+        "confidence_years": confidence_years,
+        "confidence_scales": [scales[y] for y in confidence_years],
+    }
+    tmp = CUBE_DIR / f"cube.{os.getpid()}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(header, f)
+    os.replace(tmp, CUBE_DIR / "cube.json")
+
+    # Drop cubes of older sources (workers still mapping them keep their pages)
+    current = {classes_path.name, confidence_path.name, "cube.json"}
+    for path in CUBE_DIR.iterdir():
+        if path.name not in current and ".tmp" not in path.name:
+            path.unlink(missing_ok=True)
+    return header
+
+
+def _read_header(digest):
+    try:
+        with open(CUBE_DIR / "cube.json") as f:
+            header = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if header.get("version") != CUBE_VERSION or header.get("digest") != digest:
+        return None
+    return header
+
+
+class PixelCube:
+    """Memory-mapped LULC class and confidence cubes over a shared grid."""
+
+    def __init__(self, header, record):
+        """header: the cube header; record: catalog record of one LULC layer."""
+        self.years = header["years"]
+        self.confidence_years = header["confidence_years"]
+        self.confidence_scales = dict(zip(self.confidence_years, header["confidence_scales"]))
+        self.shape = record["shape"]
+        self.transform = record["transform"]
+        self.inverse = ~record["transform"]
+        self.crs = record["crs"]
+
+        classes_path, confidence_path = _cube_files(header["digest"])
+        self.classes = np.load(classes_path, mmap_mode="r")
+        self.confidence = np.load(confidence_path, mmap_mode="r")
+        if self.classes.shape != (len(self.years), *self.shape) or \
+                self.confidence.shape != (len(self.confidence_years), *self.shape):
+            raise ValueError(f"Pixel cube {header['digest']} does not match its header")
+        self._confidence_index = {y: i for i, y in enumerate(self.confidence_years)}
+
+    def index(self, lat, lon):
+        """(row, col) of a WGS84 point, or None if it falls outside the grid."""
+        x, y = lon, lat
+        if self.crs is not None and self.crs != WGS84:
+            xs, ys = transform_coords(WGS84, self.crs, [lon], [lat])
+            x, y = xs[0], ys[0]
+        col, row = self.inverse * (x, y)
+        row, col = int(np.floor(row)), int(np.floor(col))
+        if not (0 <= row < self.shape[0] and 0 <= col < self.shape[1]):
+            return None
+        return row, col
+
+    def trajectory(self, row, col):
+        """Class code and confidence (None where missing) for every year."""
+        classes = self.classes[:, row, col].tolist()
+        confidence = self.confidence[:, row, col].tolist()
+        result = []
+        for year, code in zip(self.years, classes):
+            i = self._confidence_index.get(year)
+            conf = confidence[i] if i is not None else 0
+            result.append((year, code or None, conf or None))
+        return result
+
+
+_lock = threading.Lock()
+_cube = None
+_cube_key = None
+
+
+def _sources():
+    lulc = {r["years"][0]: r for r in catalog.layers() if r["kind"] == "lulc"}
+    confidence = {r["years"][0]: r for r in catalog.layers() if r["kind"] == "confidence"}
+    return lulc, confidence
+
+
+def _digest(key):
+    return hashlib.sha1(json.dumps(key).encode()).hexdigest()[:16]
+
+
+def get_cube():
+    """
+    The pixel cube of the current data directory, or None if there are no
+    LULC rasters. Opened from the array store, and rebuilt there only when a
+    source file is added, removed or rewritten.
+    """
+    global _cube, _cube_key
+    lulc, confidence = _sources()
+    if not lulc:
+        return None
+    key = [
+        [os.path.relpath(r["path"], DATA_DIR), *r["signature"]]
+        for r in [*lulc.values(), *confidence.values()]
+    ]
+    if key == _cube_key:
+        return _cube
+
+    with _lock:
+        if key != _cube_key:
+            digest = _digest(key)
+            header = _read_header(digest)
+            try:
+                cube = PixelCube(header, lulc[header["years"][0]]) if header else None
+            except (OSError, ValueError):
+                cube = None
+            if cube is None:
+                header = write_cube(lulc, confidence, digest)
+                cube = PixelCube(header, lulc[header["years"][0]])
+            _cube, _cube_key = cube, key
+    return _cube
@@ -0,0 +1,84 @@
+import asyncio
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial, wraps
+
+from app.config import RASTER_WORKERS
+from app.services.profiling import profiled_call
+
+# Bounded pool for blocking raster work (rasterio reads, numpy, PNG encode),
+# so async handlers never run it on the event loop.
+raster_pool = ThreadPoolExecutor(max_workers=RASTER_WORKERS, thread_name_prefix="raster")
+
+
+async def run_raster_task(fn, *args, **kwargs):
+    """
+    Run a blocking function on the raster pool and await its result. The
+    caller's context (e.g. an active request profile) carries over.
+    """
+    loop = asyncio.get_running_loop()
+    context = contextvars.copy_context()
+    return await loop.run_in_executor(
+        raster_pool, partial(context.run, profiled_call, fn, *args, **kwargs)
+    )
+
+
+def on_raster_pool(handler):
+    """
+    Turn a blocking route handler into an async one that runs on the raster
+    pool instead of Starlette's default threadpool (FastAPI still sees the
+    original signature).
+    """
+    @wraps(handler)
+    async def run(*args, **kwargs):
+        return await run_raster_task(handler, *args, **kwargs)
+    return run
+
+
+async def iterate_on_pool(iterator):
+    """Async iterator pulling each item of a blocking iterator on the raster pool."""
+    iterator = iter(iterator)
+    done = object()
+    while True:
+        item = await run_raster_task(next, iterator, done)
+        if item is done:
+            return
+        yield item
+
+
+class SingleFlight:
+    """
+    Coalesce identical in-flight computations.
+
+    The first caller for a key starts fn on the raster pool; callers arriving
+    while it runs await the same future and share its result (or exception).
+    The key is forgotten as soon as the computation finishes, so later calls
+    start fresh and rely on the regular caches.
+    """
+
+    def __init__(self):
+        self._inflight = {}
+        self.started = 0
+        self.coalesced = 0
+
+    async def run(self, key, fn, *args, **kwargs):
+        future = self._inflight.get(key)
+        if future is None:
+            future = asyncio.ensure_future(run_raster_task(fn, *args, **kwargs))
+            self._inflight[key] = future
+            future.add_done_callback(lambda _: self._inflight.pop(key, None))
+            self.started += 1
+        else:
+            self.coalesced += 1
+        # A disconnecting client must not cancel the shared computation
+        return await asyncio.shield(future)
+
+    def stats(self):
+        return {
+            "in_flight": len(self._inflight),
+            "started": self.started,
+            "coalesced": self.coalesced,
+        }
+
+
+single_flight = SingleFlight()
@@ -0,0 +1,206 @@
+import csv
+import io
+import json
+import zlib
+
+import numpy as np
+from rasterio.windows import Window
+
+from app.config import STATS_WINDOW_PIXELS, EXPORT_CHUNK_BYTES
+from app.constants import LULC_CLASSES
+from app.services.analytics_service import encode_classes, class_counts, transition_counts
+from app.services.metrics import metrics
+from app.services.raster_service import iter_windows, read_window, raster_info
+from app.services.zonal_service import load_zones, zone_labels, zone_class_counts
+
+# Reports are produced as a header plus a stream of row batches; the
+# encoders turn each batch into CSV or NDJSON text and the output is
+# flushed in EXPORT_CHUNK_BYTES pieces (optionally gzipped). Aggregate
+# reports only hold their count tables, and the pixel report walks the
+# rasters strip by strip, so memory stays constant whatever the export size.
+
+PIXEL_AREA_HA = (10 * 10) / 10000
+CLASS_CODES = list(LULC_CLASSES)
+CLASS_NAMES = list(LULC_CLASSES.values())
+
+# Rows per batch of the pixel report (bounds the Python objects alive at once)
+PIXEL_BATCH_ROWS = 50_000
+
+REPORT_COLUMNS = {
+    "lulc": ["year", "class_code", "class_name", "pixel_count", "area_ha", "percentage"],
+    "change": [
+        "start_year", "end_year", "from_code", "from_class", "to_code", "to_class",
+        "pixel_count", "area_ha", "percentage_of_from"
+    ],
+    "zones": [
+        "zone_id", "zone_name", "year", "class_code", "class_name",
+        "pixel_count", "area_ha", "percentage"
+    ],
+    "pixels": ["row", "col", "x", "y", "from_code", "to_code", "confidence"],
+}
+
+
+def _percent(part, whole):
+    return round(float(part) / whole * 100, 2) if whole else 0.0
+
+
+def _class_rows(prefix, counts):
+    """One row per class from a class_counts table (unknown codes count as valid)."""
+    k = len(CLASS_CODES)
+    valid = int(counts[:k + 1].sum())
+    return [
+        [*prefix, code, name, int(counts[i]), round(int(counts[i]) * PIXEL_AREA_HA, 2),
+         _percent(counts[i], valid)]
+        for i, (code, name) in enumerate(zip(CLASS_CODES, CLASS_NAMES))
+    ]
+
+
+def lulc_batches(paths):
+    """Class areas per year; paths maps year -> LULC raster."""
+    for year, path in paths.items():
+        counts = np.zeros(len(CLASS_CODES) + 2, dtype=np.int64)
+        for (window,) in iter_windows([path]):
+            counts += class_counts(window)
+        yield _class_rows([year], counts)
+
+
+def _strips(paths, max_pixels=STATS_WINDOW_PIXELS):
+    """(first_row, arrays) of full-width row strips of same-shaped rasters."""
+    height, width = raster_info(paths[0])["shape"]
+    rows = max(1, max_pixels // max(width, 1))
+    for row in range(0, height, rows):
+        window = Window(0, row, width, min(rows, height - row))
+        yield row, [read_window(p, window) for p in paths]
+
+
+def _confident(conf, min_confidence):
+    return np.nan_to_num(conf, nan=0) >= min_confidence
+
+
+def change_batches(pairs, min_confidence=None):
+    """
+    Transition areas per pair; pairs maps (start, end) -> (old, new, conf)
+    paths. With min_confidence only pixels whose end-year confidence reaches
+    it are counted (conf is then required).
+    """
+    k = len(CLASS_CODES)
+    for (start, end), (old_path, new_path, conf_path) in pairs.items():
+        paths = [old_path, new_path] + ([conf_path] if min_confidence is not None else [])
+        counts = np.zeros((k + 2, k + 2), dtype=np.int64)
+        for _, arrays in _strips(paths):
+            old, new = encode_classes(arrays[0]), encode_classes(arrays[1])
+            if min_confidence is not None:
+                # Unconfident pixels are dropped as nodata
+                old = np.where(_confident(arrays[2], min_confidence), old, k + 1)
+            counts += transition_counts(old, new, encoded=True)
+
+        batch = []
+        for i, j in zip(*np.nonzero(counts[:k, :k])):
+            pixels = int(counts[i, j])
+            batch.append([
+                start, end, CLASS_CODES[i], CLASS_NAMES[i], CLASS_CODES[j], CLASS_NAMES[j],
+                pixels, round(pixels * PIXEL_AREA_HA, 2), _percent(pixels, counts[i, :k].sum())
+            ])
+        yield batch
+
+
+def zone_batches(paths):
+    """Class areas per zone and year; paths maps year -> LULC raster."""
+    _, names = load_zones()
+    for year, path in paths.items():
+        nodata = raster_info(path)["nodata"]
+        counts = zone_class_counts(
+            zone_labels(path), path, 0 if nodata is None else nodata, len(names)
+        )
+        yield [
+            row
+            for z in range(1, len(names) + 1)
+            for row in _class_rows([z, names[z - 1], year], counts[z])
+        ]
+
+
+def pixel_batches(old_path, new_path, conf_path=None, min_confidence=None, changed_only=True):
+    """
+    One row per pixel (row, col, pixel-centre x/y in the raster CRS, class
+    codes and end-year confidence), streamed one row strip at a time.
+    """
+    transform = raster_info(old_path)["transform"]
+    paths = [old_path, new_path] + ([conf_path] if conf_path is not None else [])
+    for first_row, arrays in _strips(paths):
+        old, new = arrays[0], arrays[1]
+        keep = (old != 0) & (new != 0)
+        if changed_only:
+            keep &= old != new
+        if min_confidence is not None:
+            keep &= _confident(arrays[2], min_confidence)
+
+        strip_rows, strip_cols = np.nonzero(keep)
+        for start in range(0, strip_rows.size, PIXEL_BATCH_ROWS):
+            rows = strip_rows[start:start + PIXEL_BATCH_ROWS]
+            cols = strip_cols[start:start + PIXEL_BATCH_ROWS]
+            grid_rows = rows + first_row
+            x = transform.c + (cols + 0.5) * transform.a + (grid_rows + 0.5) * transform.b
+            y = transform.f + (cols + 0.5) * transform.d + (grid_rows + 0.5) * transform.e
+            conf = arrays[2][rows, cols].tolist() if conf_path is not None else [None] * rows.size
+            yield list(zip(
+                grid_rows.tolist(), cols.tolist(),
+                np.round(x, 6).tolist(), np.round(y, 6).tolist(),
+                old[rows, cols].tolist(), new[rows, cols].tolist(), conf
+            ))
+
+
+def _csv_chunks(columns, batches):
+    buf = io.StringIO()
+    writer = csv.writer(buf, lineterminator="\n")
+    writer.writerow(columns)
+    yield buf.getvalue()
+    for batch in batches:
+        buf.seek(0)
+        buf.truncate()
+        writer.writerows(batch)
+        yield buf.getvalue()
+
+
+def _ndjson_chunks(columns, batches):
+    for batch in batches:
+        yield "".join(json.dumps(dict(zip(columns, row))) + "\n" for row in batch)
+
+
+ENCODERS = {
+    "csv": ("text/csv", _csv_chunks),
+    "ndjson": ("application/x-ndjson", _ndjson_chunks),
+}
+
+
+def stream_export(columns, batches, fmt="csv", gzip=False, chunk_bytes=EXPORT_CHUNK_BYTES):
+    """
+    Encoded report as an iterator of byte chunks of about chunk_bytes,
+    gzip-compressed on the fly when asked.
+    """
+    _, encode = ENCODERS[fmt]
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31) if gzip else None
+    pending, size = [], 0
+
+    def _flush():
+        data = "".join(pending).encode()
+        pending.clear()
+        if compressor is not None:
+            data = compressor.compress(data)
+        return data
+
+    for text in encode(columns, batches):
+        pending.append(text)
+        size += len(text)
+        if size >= chunk_bytes:
+            size = 0
+            data = _flush()
+            if data:
+                metrics.inc("export_bytes_total", len(data))
+                yield data
+
+    data = _flush()
+    if compressor is not None:
+        data += compressor.flush()
+    if data:
+        metrics.inc("export_bytes_total", len(data))
+        yield data
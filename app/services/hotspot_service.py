@@ -0,0 +1,175 @@
+import numpy as np
+from rasterio.crs import CRS
+from rasterio.warp import transform as transform_coords
+
+from app.config import HOTSPOT_CELLS, STATS_WINDOW_PIXELS
+from app.constants import LULC_CLASSES
+from app.services.analytics_service import TRANSITION_BASE, changed_values
+from app.services.metrics import timed
+from app.services.raster_cache import raster_cache
+from app.services.raster_service import iter_rows, raster_info
+
+# Change rasters are reduced to a pyramid of per-cell transition counts:
+# one pass over the raster fills the finest grid (one bincount per row
+# strip), and every coarser cell size is a reshape-sum of the finest one.
+# Tables are (cells_y, cells_x, T) with T = K*K transitions (from*K + to)
+# plus a last slot for changed pixels of unknown transition (legacy 0/1
+# rasters or codes outside LULC_CLASSES).
+
+# Ground size of a pixel in metres (the export scale assumed by the area stats)
+PIXEL_SIZE = 10
+WGS84 = CRS.from_epsg(4326)
+
+
+def _cell_pixels(cell):
+    if cell % PIXEL_SIZE:
+        raise ValueError(f"Hotspot cell size {cell} m is not a multiple of the {PIXEL_SIZE} m pixel")
+    return cell // PIXEL_SIZE
+
+
+def _transition_lut(classes=LULC_CLASSES):
+    """uint8 change value -> transition slot, -1 for unchanged / nodata."""
+    k = len(classes)
+    values = np.arange(256)
+    lut = np.where(changed_values(values), k * k, -1).astype(np.int16)
+    for i, a in enumerate(classes):
+        for j, b in enumerate(classes):
+            code = a * TRANSITION_BASE + b
+            if a != b and code < 256:
+                lut[code] = i * k + j
+    return lut
+
+
+def _as_uint8(values):
+    if values.dtype == np.uint8:
+        return values
+    finite = np.isfinite(values) if values.dtype.kind == "f" else True
+    return np.where(finite & (values > 0) & (values < 256), values, 0).astype(np.uint8)
+
+
+def reduce_cells(table, factor):
+    """Sum factor x factor blocks of a (y, x, ...) table; edges are zero-padded."""
+    ny, nx = table.shape[:2]
+    pad_y, pad_x = -ny % factor, -nx % factor
+    if pad_y or pad_x:
+        table = np.pad(table, [(0, pad_y), (0, pad_x)] + [(0, 0)] * (table.ndim - 2))
+    ny, nx = table.shape[:2]
+    return table.reshape(ny // factor, factor, nx // factor, factor, *table.shape[2:]).sum(axis=(1, 3))
+
+
+class HotspotPyramid:
+    """Per-cell transition counts of one change raster at every HOTSPOT_CELLS size."""
+
+    def __init__(self, levels, shape, transform, crs):
+        self.levels = levels
+        self.shape = shape
+        self.transform = transform
+        self.crs = crs
+
+    @property
+    def nbytes(self):
+        return sum(table.nbytes for table in self.levels.values())
+
+
+@timed("hotspot_reduce")
+def build_pyramid(change_path, cells=HOTSPOT_CELLS, classes=LULC_CLASSES):
+    """Reduce a change raster into a HotspotPyramid in one streaming pass."""
+    cells = sorted(cells)
+    base = _cell_pixels(cells[0])
+    for cell in cells[1:]:
+        if _cell_pixels(cell) % base:
+            raise ValueError(f"Hotspot cell size {cell} m is not a multiple of {cells[0]} m")
+
+    info = raster_info(change_path)
+    height, width = info["shape"]
+    slots = len(classes) ** 2 + 1
+    lut = _transition_lut(classes)
+    nx = -(-width // base)
+    table = np.zeros((-(-height // base), nx, slots), dtype=np.int32)
+
+    # Strips are whole rows of base cells
+    strip_rows = max(1, STATS_WINDOW_PIXELS // (base * width)) * base
+    for row, strip in iter_rows(change_path, max_pixels=strip_rows * width):
+        slot = lut[_as_uint8(strip)]
+        rows, cols = np.nonzero(slot >= 0)
+        cell_rows = -(-strip.shape[0] // base)
+        ids = ((rows // base) * nx + cols // base) * slots + slot[rows, cols]
+        band = np.bincount(ids, minlength=cell_rows * nx * slots)
+        table[row // base:row // base + cell_rows] += band.reshape(cell_rows, nx, slots).astype(np.int32)
+
+    levels = {cells[0]: table}
+    for cell in cells[1:]:
+        levels[cell] = reduce_cells(table, _cell_pixels(cell) // base)
+    return HotspotPyramid(levels, (height, width), info["transform"], info["crs"])
+
+
+def load_pyramid(change_path):
+    """HotspotPyramid of a change raster, cached next to the raster itself."""
+    return raster_cache.get(change_path, build_pyramid, variant="hotspots")
+
+
+def _cell_polygons(pyramid, cell_px, cy, cx):
+    """WGS84 rings of the given cells, clipped to the raster extent."""
+    height, width = pyramid.shape
+    r0, c0 = cy * cell_px, cx * cell_px
+    r1, c1 = np.minimum(r0 + cell_px, height), np.minimum(c0 + cell_px, width)
+    corner_cols = np.stack([c0, c1, c1, c0, c0], axis=1).astype(np.float64)
+    corner_rows = np.stack([r0, r0, r1, r1, r0], axis=1).astype(np.float64)
+
+    t = pyramid.transform
+    xs = t.c + corner_cols * t.a + corner_rows * t.b
+    ys = t.f + corner_cols * t.d + corner_rows * t.e
+    if pyramid.crs is not None and pyramid.crs != WGS84:
+        lon, lat = transform_coords(pyramid.crs, WGS84, xs.ravel(), ys.ravel())
+        xs, ys = np.reshape(lon, xs.shape), np.reshape(lat, ys.shape)
+    return np.round(xs, 6), np.round(ys, 6), (r1 - r0) * (c1 - c0)
+
+
+@timed("payload")
+def hotspot_geojson(pyramid, cell, classes=LULC_CLASSES):
+    """
+    FeatureCollection of the cells of one pyramid level that contain change,
+    with changed area, share of the cell and dominant transition.
+    """
+    if cell not in pyramid.levels:
+        raise ValueError(f"Unsupported cell size {cell} m, use one of {sorted(pyramid.levels)}")
+    table = pyramid.levels[cell]
+    k = len(classes)
+    names = list(classes.values())
+    pixel_area_ha = (PIXEL_SIZE * PIXEL_SIZE) / 10000
+
+    changed = table.sum(axis=-1)
+    cy, cx = np.nonzero(changed)
+    counts = table[cy, cx]
+    changed = changed[cy, cx]
+    dominant = counts[:, :k * k].argmax(axis=1)
+    dominant_count = counts[np.arange(len(dominant)), dominant]
+    xs, ys, cell_pixels = _cell_polygons(pyramid, _cell_pixels(cell), cy, cx)
+
+    features = []
+    for n in range(len(cy)):
+        known = dominant_count[n] > 0
+        features.append({
+            "type": "Feature",
+            "geometry": {
+                "type": "Polygon",
+                "coordinates": [list(zip(xs[n].tolist(), ys[n].tolist()))]
+            },
+            "properties": {
+                "row": int(cy[n]),
+                "col": int(cx[n]),
+                "changed_area_ha": round(int(changed[n]) * pixel_area_ha, 2),
+                "changed_percentage": round(int(changed[n]) / int(cell_pixels[n]) * 100, 2),
+                # None when the raster does not record transitions (legacy 0/1)
+                "dominant_from": names[dominant[n] // k] if known else None,
+                "dominant_to": names[dominant[n] % k] if known else None,
+                "dominant_area_ha": round(int(dominant_count[n]) * pixel_area_ha, 2) if known else None,
+            }
+        })
+
+    return {
+        "type": "FeatureCollection",
+        "cell_m": cell,
+        "total_changed_area_ha": round(int(changed.sum()) * pixel_area_ha, 2),
+        "features": features
+    }
@@ -1,6 +1,9 @@
 import numpy as np
 from PIL import Image
 import io
+from app.config import PNG_COMPRESS_LEVEL
+from app.services.analytics_service import TRANSITION_BASE, changed_values
+from app.services.metrics import metrics, timed
 
 # LULC HSL to RGB approximations
 # Forest: 142 50% 35% -> (45, 134, 69)
@@ -17,80 +20,136 @@ LULC_COLOR_MAP = {
     5: (115, 115, 115)
 }
 
-def create_lulc_image(data):
-    """Convert LULC numpy array to color-coded RGBA PNG bytes."""
-    h, w = data.shape
-    rgba = np.zeros((h, w, 4), dtype=np.uint8)
-    
-    for val, color in LULC_COLOR_MAP.items():
-        mask = (data == val)
-        rgba[mask, :3] = color
-        rgba[mask, 3] = 255 # Opaque
-        
-    # Set background/nodata (0) to transparent
-    rgba[data == 0, 3] = 0
-    
-    img = Image.fromarray(rgba, 'RGBA')
-    buf = io.BytesIO()
-    img.save(buf, format='PNG')
-    return buf.getvalue()
+# Renderers map raster values onto a small palette with a single lookup
+# table gather (lut[data]) and emit paletted PNGs; palette entry 0 is always
+# fully transparent (background/nodata). Entries are (r, g, b, alpha).
+
+LULC_PALETTE = [(0, 0, 0, 0)] + [color + (255,) for color in LULC_COLOR_MAP.values()]
 
-def create_change_image(data):
-    """Convert Change numpy array to red-themed RGBA PNG bytes."""
-    h, w = data.shape
-    rgba = np.zeros((h, w, 4), dtype=np.uint8)
-    
-    # Change raster: 1 = Change detected
-    # We'll use a semi-transparent red for changes
-    mask = (data != 0)
-    rgba[mask] = [220, 38, 38, 180] # Red with some transparency
-    
-    # Unchanged is transparent
-    rgba[~mask, 3] = 0
-    
-    img = Image.fromarray(rgba, 'RGBA')
+# Change raster: 1 = Change detected, shown as semi-transparent red.
+# Transition-coded rasters (from * 10 + to) get one entry per from -> to
+# pair, coloured as the destination class tinted towards the source class;
+# unchanged pixels stay transparent and unlisted codes fall back to red.
+CHANGE_TRANSITIONS = [
+    (a, b) for a in LULC_COLOR_MAP for b in LULC_COLOR_MAP if a != b
+]
+CHANGE_PALETTE = [(0, 0, 0, 0), (220, 38, 38, 180)] + [
+    tuple(round(0.7 * t + 0.3 * f) for f, t in zip(LULC_COLOR_MAP[a], LULC_COLOR_MAP[b])) + (200,)
+    for a, b in CHANGE_TRANSITIONS
+]
+
+# Confidence bands: < 80 high-alert red, 80-90 amber, >= 90 green
+CONFIDENCE_THRESHOLDS = (80, 90)
+CONFIDENCE_PALETTE = [
+    (0, 0, 0, 0),
+    (239, 68, 68, 180),
+    (245, 158, 11, 180),
+    (34, 197, 94, 180)
+]
+
+@timed("png_encode")
+def encode_indexed_png(index, palette, compress_level=PNG_COMPRESS_LEVEL):
+    """
+    Encode a uint8 palette-index array as a 'P' mode PNG with a tRNS chunk.
+    Short palettes are written at 1/2/4 bits per pixel.
+    """
+    img = Image.fromarray(np.ascontiguousarray(index, dtype=np.uint8))
+    img.putpalette([c for color in palette for c in color[:3]])
     buf = io.BytesIO()
-    img.save(buf, format='PNG')
+    img.save(
+        buf,
+        format='PNG',
+        transparency=bytes(color[3] for color in palette),
+        compress_level=compress_level
+    )
+    metrics.inc("png_bytes_emitted_total", buf.tell())
     return buf.getvalue()
 
-def create_confidence_image(data):
+def _lookup(data, lut_for_values):
     """
-    Convert Confidence numpy array to heat-map RGBA PNG bytes.
-    Data is expected to be 0-1 or class-id-like. 
-    We'll assume 0 is nodata, and 1-5 or 0-100 values.
+    Apply a value -> palette index table in one gather. lut_for_values
+    receives the integer values 0..max and returns their palette indices;
+    negative values map to index 0 (transparent).
     """
-    h, w = data.shape
-    rgba = np.zeros((h, w, 4), dtype=np.uint8)
-    
+    if data.dtype.kind not in "ui":
+        data = data.astype(np.int64)
+    if data.dtype.kind == "i":
+        data = np.maximum(data, 0)
+    if data.dtype == np.uint8:
+        size = 256
+    else:
+        size = int(data.max(initial=0)) + 1
+    lut = np.asarray(lut_for_values(np.arange(size)), dtype=np.uint8)
+    return lut[data]
+
+@timed("colorize")
+def lulc_index(data):
+    """Palette indices (LULC_PALETTE) of a LULC array."""
+    def lut(values):
+        table = np.zeros(values.size, dtype=np.uint8)
+        for i, val in enumerate(LULC_COLOR_MAP, start=1):
+            if val < values.size:
+                table[val] = i
+        return table
+    return _lookup(data, lut)
+
+def _change_lut(values):
+    index = changed_values(values).astype(np.uint8)
+    for i, (a, b) in enumerate(CHANGE_TRANSITIONS, start=2):
+        code = a * TRANSITION_BASE + b
+        if code < index.size:
+            index[code] = i
+    return index
+
+@timed("colorize")
+def change_index(data):
+    """Palette indices (CHANGE_PALETTE) of a legacy or transition-coded change array."""
+    if data.dtype.kind == "f":
+        # Non-finite values have always rendered as changed
+        finite = np.isfinite(data)
+        return np.where(finite, _lookup(np.where(finite, data, 0), _change_lut), 1).astype(np.uint8)
+    return _lookup(data, _change_lut)
+
+@timed("colorize")
+def confidence_index(data):
+    """
+    Palette indices (CONFIDENCE_PALETTE) of a confidence array.
+    Data is expected to be 0-1 or 0-100; 0 is nodata.
+    """
+    if data.dtype.kind == "f":
+        # NaN / inf are nodata: ignored for the range, rendered transparent
+        finite = np.isfinite(data)
+        max_val = data.max(initial=0, where=finite)
+    else:
+        max_val = data.max(initial=0)
+
     # Handle both 0-1 and 0-100 ranges
-    max_val = data.max()
-    if max_val > 0:
-        if max_val <= 1.05:
-            norm_data = data * 100
-        else:
-            norm_data = data
-            
-        # Simple colormap: 
-        # < 80: Reddish
-        # 80-90: Yellowish
-        # > 90: Greenish
-        
-        # Low confidence (< 80)
-        mask_low = (norm_data > 0) & (norm_data < 80)
-        rgba[mask_low] = [239, 68, 68, 180] # High-alert red
-        
-        # Med confidence (80-90)
-        mask_med = (norm_data >= 80) & (norm_data < 90)
-        rgba[mask_med] = [245, 158, 11, 180] # Amber
-        
-        # High confidence (>= 90)
-        mask_high = (norm_data >= 90)
-        rgba[mask_high] = [34, 197, 94, 180] # Green
-        
-        # Background is transparent
-        rgba[norm_data == 0, 3] = 0
-    
-    img = Image.fromarray(rgba, 'RGBA')
-    buf = io.BytesIO()
-    img.save(buf, format='PNG')
-    return buf.getvalue()
+    scale = 100 if 0 < max_val <= 1.05 else 1
+
+    if data.dtype.kind == "f":
+        norm_data = data * scale if scale != 1 else data
+        # Bin edges: (0, 80, 90); values <= 0 stay transparent
+        edges = [np.nextafter(0, 1), *CONFIDENCE_THRESHOLDS]
+        return np.where(finite, np.digitize(norm_data, edges), 0).astype(np.uint8)
+
+    low, high = CONFIDENCE_THRESHOLDS
+    return _lookup(
+        data,
+        lambda values: (values * scale > 0).astype(np.uint8)
+        + (values * scale >= low) + (values * scale >= high)
+    )
+
+def create_lulc_image(data, compress_level=PNG_COMPRESS_LEVEL):
+    """Convert LULC numpy array to color-coded paletted PNG bytes."""
+    return encode_indexed_png(lulc_index(data), LULC_PALETTE, compress_level)
+
+def create_change_image(data, compress_level=PNG_COMPRESS_LEVEL):
+    """Convert Change numpy array to paletted PNG bytes (red or per-transition colours)."""
+    index = change_index(data)
+    # Legacy 0/1 rasters only need the first two entries (1 bit per pixel)
+    palette = CHANGE_PALETTE[:max(2, int(index.max(initial=0)) + 1)]
+    return encode_indexed_png(index, palette, compress_level)
+
+def create_confidence_image(data, compress_level=PNG_COMPRESS_LEVEL):
+    """Convert Confidence numpy array to heat-map paletted PNG bytes."""
+    return encode_indexed_png(confidence_index(data), CONFIDENCE_PALETTE, compress_level)
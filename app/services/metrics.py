@@ -0,0 +1,131 @@
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+
+# Process-wide latency histograms and byte counters, rendered in the
+# Prometheus text format by GET /metrics. Stages may nest (e.g. "count"
+# includes "encode" when handed a raw raster), so stage times are not
+# additive.
+
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+METRICS = {
+    "stage_duration_seconds": (
+        "histogram", "Latency of raster read, decode, numpy, PNG and JSON stages"
+    ),
+    "http_request_duration_seconds": ("histogram", "Latency of API requests per route"),
+    "http_response_bytes_total": ("counter", "Response body bytes emitted per route"),
+    "raster_bytes_read_total": ("counter", "Decoded raster bytes read from disk"),
+    "png_bytes_emitted_total": ("counter", "Encoded PNG bytes produced by the renderers"),
+    "export_bytes_total": ("counter", "Bytes streamed by /export (after compression)"),
+}
+
+
+class Histogram:
+    def __init__(self):
+        self.buckets = [0] * len(BUCKETS)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        for i, bound in enumerate(BUCKETS):
+            if value <= bound:
+                self.buckets[i] += 1
+                break
+        self.count += 1
+        self.sum += value
+
+
+class MetricsRegistry:
+    """Labelled histograms and counters, keyed by (name, sorted labels)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._histograms = {}
+        self._counters = {}
+
+    def observe(self, name, value, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            hist = self._histograms.get(key)
+            if hist is None:
+                hist = self._histograms[key] = Histogram()
+            hist.observe(value)
+
+    def inc(self, name, amount=1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    def clear(self):
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+
+    def render(self, gauges=None):
+        """
+        Prometheus text exposition of every metric. gauges maps extra gauge
+        names to numeric values (e.g. cache counters).
+        """
+        with self._lock:
+            histograms = {k: (list(h.buckets), h.count, h.sum) for k, h in self._histograms.items()}
+            counters = dict(self._counters)
+
+        lines = []
+        for name, (kind, help_text) in METRICS.items():
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"]
+            if kind == "histogram":
+                for (metric, labels), (buckets, count, total) in sorted(histograms.items()):
+                    if metric != name:
+                        continue
+                    cumulative = 0
+                    for bound, n in zip(BUCKETS, buckets):
+                        cumulative += n
+                        lines.append(f"{name}_bucket{_labels(labels, le=bound)} {cumulative}")
+                    lines.append(f'{name}_bucket{_labels(labels, le="+Inf")} {count}')
+                    lines.append(f"{name}_sum{_labels(labels)} {total}")
+                    lines.append(f"{name}_count{_labels(labels)} {count}")
+            else:
+                for (metric, labels), value in sorted(counters.items()):
+                    if metric == name:
+                        lines.append(f"{name}{_labels(labels)} {value}")
+
+        for name, value in (gauges or {}).items():
+            lines += [f"# TYPE {name} gauge", f"{name} {value}"]
+        return "\n".join(lines) + "\n"
+
+
+def _labels(labels, **extra):
+    items = list(labels) + list(extra.items())
+    if not items:
+        return ""
+    escaped = (
+        (k, str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+        for k, v in items
+    )
+    return "{" + ",".join(f'{k}="{v}"' for k, v in escaped) + "}"
+
+
+metrics = MetricsRegistry()
+
+
+@contextmanager
+def stage(name):
+    """Record the duration of a block under stage_duration_seconds{stage=name}."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        metrics.observe("stage_duration_seconds", time.perf_counter() - started, stage=name)
+
+
+def timed(name):
+    """Decorator form of stage()."""
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            with stage(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,110 @@
+import cProfile
+import io
+import pstats
+import threading
+import time
+from contextvars import ContextVar
+
+from app.config import PROFILING_ENABLED, PROFILE_DIR
+
+# Opt-in per-request profiling. A profiled request carries a RequestProfile
+# in a context variable; blocking work run through profiled_call (sync route
+# handlers and raster pool tasks) is profiled in the thread that executes
+# it, and the request's profiles are merged into one dump.
+
+PROFILE_MODES = ("cprofile", "pyinstrument")
+
+_current = ContextVar("request_profile", default=None)
+
+
+def profile_mode(request):
+    """
+    Profiler requested by the X-Profile header or ?profile= query flag
+    ("1"/"cprofile" or "pyinstrument"); None when profiling is disabled.
+    """
+    if not PROFILING_ENABLED:
+        return None
+    flag = request.headers.get("x-profile") or request.query_params.get("profile")
+    if not flag or flag.lower() in ("0", "false", "no"):
+        return None
+    flag = flag.lower()
+    return flag if flag in PROFILE_MODES else "cprofile"
+
+
+class RequestProfile:
+    def __init__(self, name, mode="cprofile"):
+        self.name = name
+        self.mode = mode
+        if mode == "pyinstrument":
+            try:
+                import pyinstrument  # noqa: F401
+            except ImportError:
+                self.mode = "cprofile"
+        self._lock = threading.Lock()
+        self._profiles = []
+
+    def call(self, fn, *args, **kwargs):
+        if self.mode == "pyinstrument":
+            from pyinstrument import Profiler
+            profiler = Profiler(async_mode="disabled")
+            profiler.start()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                profiler.stop()
+                with self._lock:
+                    self._profiles.append(profiler)
+
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            profiler.disable()
+            with self._lock:
+                self._profiles.append(profiler)
+
+    def dump(self):
+        """Write the merged profile to PROFILE_DIR; returns its path (or None)."""
+        with self._lock:
+            profiles = list(self._profiles)
+        if not profiles:
+            return None
+
+        PROFILE_DIR.mkdir(parents=True, exist_ok=True)
+        slug = self.name.strip("/").replace("/", "_") or "root"
+        stem = PROFILE_DIR / f"{time.strftime('%Y%m%d-%H%M%S')}_{slug}_{time.perf_counter_ns() % 10**6}"
+
+        if self.mode == "pyinstrument":
+            path = stem.with_suffix(".html")
+            path.write_text("\n".join(p.output_html() for p in profiles))
+            return path
+
+        # Binary dump for snakeviz/pstats, plus a readable top-40 summary
+        stats = pstats.Stats(profiles[0])
+        for profile in profiles[1:]:
+            stats.add(profile)
+        path = stem.with_suffix(".prof")
+        stats.dump_stats(path)
+        text = io.StringIO()
+        pstats.Stats(str(path), stream=text).sort_stats("cumulative").print_stats(40)
+        stem.with_suffix(".txt").write_text(text.getvalue())
+        return path
+
+
+def start_profile(name, mode):
+    """Attach a new RequestProfile to the current context; returns (profile, token)."""
+    profile = RequestProfile(name, mode)
+    return profile, _current.set(profile)
+
+
+def stop_profile(token):
+    _current.reset(token)
+
+
+def profiled_call(fn, *args, **kwargs):
+    """Call fn, profiling it if the current request asked for a profile."""
+    profile = _current.get()
+    if profile is None:
+        return fn(*args, **kwargs)
+    return profile.call(fn, *args, **kwargs)
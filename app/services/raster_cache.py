@@ -0,0 +1,140 @@
+import hashlib
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from app.config import RASTER_CACHE_BYTES
+from app.services.catalog import file_signature, layer_signature
+
+
+_hash_lock = threading.Lock()
+_hashes = {}
+
+
+def file_hash(path):
+    """SHA-256 of a file, memoised per (path, mtime, size)."""
+    key = (str(path), file_signature(path))
+    with _hash_lock:
+        if key in _hashes:
+            return _hashes[key]
+
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+
+    with _hash_lock:
+        _hashes[key] = digest.hexdigest()
+    return _hashes[key]
+
+
+def _nbytes(value):
+    # Memory-mapped arrays live in the shared page cache, not in this process
+    if isinstance(value, np.memmap):
+        return 0
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, (tuple, list)):
+        return sum(_nbytes(v) for v in value)
+    # Compact containers (e.g. PackedMask) report their own size
+    return getattr(value, "nbytes", 0)
+
+
+def _freeze(value):
+    # Cached arrays are shared between requests, so make them read-only
+    if isinstance(value, np.ndarray):
+        value.setflags(write=False)
+    elif isinstance(value, (tuple, list)):
+        for v in value:
+            _freeze(v)
+    return value
+
+
+class RasterCache:
+    """
+    Process-wide LRU cache of decoded rasters.
+
+    Entries are keyed by file path (plus an optional variant key) and are
+    invalidated when the file's mtime or size changes. Total size of the
+    cached arrays is kept under max_bytes by evicting least recently used
+    entries.
+    """
+
+    def __init__(self, max_bytes=RASTER_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, path, loader, variant=None):
+        """Return the cached value for path, calling loader(path) on a miss."""
+        path = str(path)
+        key = (path, variant)
+        signature = layer_signature(path)
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] == signature:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry[1]
+                self._drop(key)
+                self.invalidations += 1
+            self.misses += 1
+
+        value = _freeze(loader(path))
+        size = _nbytes(value)
+
+        with self._lock:
+            if size <= self.max_bytes:
+                if key in self._entries:
+                    self._drop(key)
+                self._entries[key] = (signature, value, size)
+                self.current_bytes += size
+                while self.current_bytes > self.max_bytes:
+                    self._drop(next(iter(self._entries)))
+                    self.evictions += 1
+
+        return value
+
+    def peek(self, path, variant=None):
+        """Return the cached value if present and fresh, without loading."""
+        path = str(path)
+        with self._lock:
+            entry = self._entries.get((path, variant))
+        try:
+            if entry is None or entry[0] != layer_signature(path):
+                return None
+        except OSError:
+            return None
+        return entry[1]
+
+    def _drop(self, key):
+        _, _, size = self._entries.pop(key)
+        self.current_bytes -= size
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "current_bytes": self.current_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+
+raster_cache = RasterCache()
@@ -1,41 +1,238 @@
+import numpy as np
 import rasterio
-from app.config import LULC_DIR, CHANGE_DIR, CONFIDENCE_DIR
+from rasterio.enums import Resampling
+from rasterio.windows import Window
+from contextlib import ExitStack
+from app.config import LULC_DIR, CHANGE_DIR, STATS_WINDOW_PIXELS
+from app.services.raster_cache import raster_cache
+from app.services.array_store import open_array, read_header
+from app.services.metrics import metrics, stage
+from app.services.analytics_service import TRANSITION_BASE, changed_mask
+from app.services.compact import narrow_uint8, PackedMask
+from app.services.catalog import catalog
 from pathlib import Path
 
-# Year-to-file mapping for confidence rasters
-CONFIDENCE_YEAR_MAP = {
-    2024: "Tirupati_Confidence_2024.tif",
-    2025: "Tirupati_Confidence_2025.tif"
+def _read_band(src, **kwargs):
+    """src.read(1, ...) recorded as the raster_read stage and in bytes read."""
+    with stage("raster_read"):
+        data = src.read(1, **kwargs)
+    metrics.inc("raster_bytes_read_total", data.nbytes)
+    return data
+
+def _read_raster(path):
+    # Prefer the memory-mapped array store: no decoding, shared page cache
+    with stage("store_open"):
+        stored = open_array(path)
+    if stored is not None:
+        return stored
+    with rasterio.open(path) as src:
+        # Class/confidence codes are held as uint8 whenever that is lossless
+        return narrow_uint8(_read_band(src), src.nodata), src.nodata
+
+def _resident(path):
+    """
+    (data, nodata) if the raster can be used without decoding, i.e. it is
+    in the raster cache or has an array-store entry; None otherwise.
+    """
+    cached = raster_cache.peek(path)
+    if cached is None and read_header(path) is not None:
+        cached = load_raster(path)
+    return cached
+
+def decimated_shape(shape, max_size):
+    """Shape scaled down (aspect preserved) so neither side exceeds max_size."""
+    height, width = shape
+    scale = max_size / max(height, width)
+    if scale >= 1:
+        return shape
+    return max(1, round(height * scale)), max(1, round(width * scale))
+
+def _read_decimated(max_size):
+    def read(path):
+        with rasterio.open(path) as src:
+            # GDAL serves reduced out_shape reads from the closest overview
+            out_shape = decimated_shape(src.shape, max_size)
+            data = _read_band(src, out_shape=out_shape, resampling=Resampling.nearest)
+            return narrow_uint8(data, src.nodata), src.nodata
+    return read
+
+def load_raster(path, max_size=None):
+    """
+    Load a single-band raster and return (data, nodata).
+    With max_size, the raster is read at a reduced resolution (longest side
+    at most max_size pixels) from the matching overview when available.
+    Decoded arrays are shared through the process-wide raster cache and are
+    read-only; copy before modifying.
+    """
+    if max_size is None:
+        return raster_cache.get(path, _read_raster)
+    return raster_cache.get(path, _read_decimated(max_size), variant=("decimated", max_size))
+
+def _read_info(path):
+    with rasterio.open(path) as src:
+        return {
+            "shape": src.shape,
+            "nodata": src.nodata,
+            "dtype": src.dtypes[0],
+            "block_shape": src.block_shapes[0],
+            "transform": src.transform,
+            "crs": src.crs,
+        }
+
+def raster_info(path):
+    """
+    Shape, nodata, dtype, block shape, transform and CRS of a raster, from
+    the dataset catalog (or read once and cached for other files).
+    """
+    record = catalog.info(path)
+    if record is not None:
+        return record
+    return raster_cache.get(path, _read_info, variant="info")
+
+def aligned_windows(src, max_pixels):
+    """
+    Windows covering the raster, aligned to its internal blocks. Whole rows
+    of blocks are grouped into strips of at most max_pixels; when a single
+    row of blocks is already larger than that, the blocks are used as-is.
+    """
+    height, width = src.shape
+    block_h, _ = src.block_shapes[0]
+    if block_h * width > max_pixels:
+        for _, window in src.block_windows(1):
+            yield window
+        return
+
+    rows = max(1, max_pixels // (block_h * width)) * block_h
+    for row in range(0, height, rows):
+        yield Window(0, row, width, min(rows, height - row))
+
+def iter_windows(paths, max_pixels=STATS_WINDOW_PIXELS):
+    """
+    Stream aligned windows of several same-shaped single-band rasters.
+    Yields one list of arrays (in the order of paths) per window.
+
+    Rasters already held by the raster cache (or memory-mapped from the
+    array store) are sliced in place; otherwise the windows are decoded from
+    disk one at a time, so peak memory is bounded by max_pixels rather than
+    the raster size. Entries may also be in-memory arrays on the same grid
+    (e.g. a zone label raster); they are sliced alongside.
+    """
+    given = [p if isinstance(p, np.ndarray) else None for p in paths]
+    cached = [(a, None) if a is not None else _resident(p) for a, p in zip(given, paths)]
+    if all(c is not None for c in cached):
+        arrays = [c[0] for c in cached]
+        for a in arrays[1:]:
+            if a.shape != arrays[0].shape:
+                raise ValueError(
+                    f"Raster shapes differ: {arrays[0].shape} vs {a.shape}"
+                )
+        height, width = arrays[0].shape
+        rows = max(1, max_pixels // max(width, 1))
+        for row in range(0, height, rows):
+            yield [a[row:row + rows] for a in arrays]
+        return
+
+    with ExitStack() as stack:
+        sources = [
+            None if a is not None else stack.enter_context(rasterio.open(p))
+            for a, p in zip(given, paths)
+        ]
+        first = next(src for src in sources if src is not None)
+        shapes = [a.shape if a is not None else src.shape for a, src in zip(given, sources)]
+        for shape in shapes:
+            if shape != first.shape:
+                raise ValueError(
+                    f"Raster shapes differ: {first.shape} vs {shape}"
+                )
+        for window in aligned_windows(first, max_pixels):
+            yield [
+                a[window.toslices()] if a is not None else _read_band(src, window=window)
+                for a, src in zip(given, sources)
+            ]
+
+def iter_rows(path, max_pixels=STATS_WINDOW_PIXELS):
+    """
+    Stream full-width row strips of one raster as (first_row, array), from
+    the raster cache / array store when resident, otherwise from disk.
+    """
+    cached = _resident(path)
+    if cached is not None:
+        data = cached[0]
+        rows = max(1, max_pixels // max(data.shape[1], 1))
+        for row in range(0, data.shape[0], rows):
+            yield row, data[row:row + rows]
+        return
+
+    with rasterio.open(path) as src:
+        height, width = src.shape
+        rows = max(1, max_pixels // max(width, 1))
+        for row in range(0, height, rows):
+            yield row, _read_band(src, window=Window(0, row, width, min(rows, height - row)))
+
+# Bit-packed masks derived from a raster, cached next to it (1 bit/pixel):
+#   changed:    changed pixels of a legacy or transition-coded change raster
+#   transition: pixels holding a transition code (>= TRANSITION_BASE), i.e.
+#               the valid pixels of a transition-coded change raster
+#   valid:      pixels > 0 (0 is nodata/background in confidence rasters)
+MASK_KINDS = {
+    "changed": changed_mask,
+    "transition": lambda strip: strip >= TRANSITION_BASE,
+    "valid": lambda strip: strip > 0,
 }
 
-def load_raster(path):
-    """Load a single-band raster and return as numpy array."""
+def _mask_loader(kind):
+    def read(path):
+        def rows():
+            for _, strip in iter_rows(path):
+                yield MASK_KINDS[kind](strip)
+
+        return PackedMask.from_rows(rows(), raster_info(path)["shape"][1])
+    return read
+
+def load_mask(path, kind):
+    """Cached PackedMask (one of MASK_KINDS) of a raster."""
+    if kind not in MASK_KINDS:
+        raise ValueError(f"Unknown mask kind: {kind}")
+    return raster_cache.get(path, _mask_loader(kind), variant=("mask", kind))
+
+def read_window(path, window):
+    """
+    Read one window of a single-band raster: sliced from the raster cache
+    or array store when available, otherwise read from disk.
+    """
+    cached = _resident(path)
+    if cached is not None:
+        return cached[0][window.toslices()]
     with rasterio.open(path) as src:
-        return src.read(1), src.nodata
+        return _read_band(src, window=window)
+
+def lulc_path(year: int) -> Path:
+    return LULC_DIR / f"Tirupati_LULC_{year}.tif"
+
+def change_path(start: int, end: int) -> Path:
+    return CHANGE_DIR / f"Tirupati_LULC_Change_{start}_{end}.tif"
+
+def confidence_path(year: int) -> Path:
+    """
+    Path of the confidence raster for a given year.
+    Raises FileNotFoundError if the catalog has no confidence layer for it.
+    """
+    return catalog.path("confidence", year)
 
-def load_lulc(year: int):
+def load_lulc(year: int, max_size=None):
     """Load LULC raster for a given year."""
-    data, _ = load_raster(LULC_DIR / f"Tirupati_LULC_{year}.tif")
+    data, _ = load_raster(lulc_path(year), max_size)
     return data
 
-def load_change(start: int, end: int):
+def load_change(start: int, end: int, max_size=None):
     """Load change raster for a given year range."""
-    data, _ = load_raster(
-        CHANGE_DIR / f"Tirupati_LULC_Change_{start}_{end}.tif"
-    )
+    data, _ = load_raster(change_path(start, end), max_size)
     return data
 
-def load_confidence(year: int):
+def load_confidence(year: int, max_size=None):
     """
     Load confidence raster for a given year.
     Returns tuple of (data, nodata_value).
     Raises FileNotFoundError if year is not supported.
     """
-    if year not in CONFIDENCE_YEAR_MAP:
-        raise FileNotFoundError(
-            f"Confidence data not available for year {year}. "
-            f"Available years: {list(CONFIDENCE_YEAR_MAP.keys())}"
-        )
-    
-    filepath = CONFIDENCE_DIR / CONFIDENCE_YEAR_MAP[year]
-    return load_raster(filepath)
+    return load_raster(confidence_path(year), max_size)
@@ -0,0 +1,128 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+from app.config import RENDER_CACHE_BYTES, RENDER_CACHE_DIR
+from app.services.catalog import layer_signature
+
+
+def render_etag(layer, path, params=()):
+    """
+    Strong ETag for a rendered image, derived from the layer name, the
+    source file fingerprint (from the dataset catalog) and the render
+    parameters, so the raster itself is never opened.
+    """
+    mtime_ns, size = layer_signature(path)
+    key = repr((layer, str(path), mtime_ns, size, tuple(params)))
+    return '"' + hashlib.sha1(key.encode()).hexdigest() + '"'
+
+
+def etag_matches(if_none_match, etag):
+    """Evaluate an If-None-Match header against an ETag (weak comparison)."""
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+class RenderCache:
+    """
+    Bounded LRU cache of encoded image bytes keyed by ETag.
+
+    Entries evicted from memory are written to spill_dir (when configured)
+    and read back on the next miss, so re-rendering only happens when the
+    source file or the render parameters change.
+    """
+
+    def __init__(self, max_bytes=RENDER_CACHE_BYTES, spill_dir=RENDER_CACHE_DIR):
+        self.max_bytes = max_bytes
+        self.spill_dir = Path(spill_dir) if spill_dir else None
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.current_bytes = 0
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _spill_path(self, etag):
+        return self.spill_dir / (etag.strip('"') + ".bin")
+
+    def get(self, etag, render):
+        """Return the bytes for etag, calling render() on a miss."""
+        with self._lock:
+            content = self._entries.get(etag)
+            if content is not None:
+                self._entries.move_to_end(etag)
+                self.hits += 1
+                return content
+
+        content = None
+        if self.spill_dir is not None:
+            try:
+                content = self._spill_path(etag).read_bytes()
+                with self._lock:
+                    self.disk_hits += 1
+            except OSError:
+                pass
+
+        if content is None:
+            with self._lock:
+                self.misses += 1
+            content = render()
+
+        self._store(etag, content)
+        return content
+
+    def _store(self, etag, content):
+        evicted = []
+        with self._lock:
+            if etag in self._entries:
+                return
+            if len(content) > self.max_bytes:
+                evicted.append((etag, content))
+            else:
+                self._entries[etag] = content
+                self.current_bytes += len(content)
+                while self.current_bytes > self.max_bytes:
+                    old_etag, old_content = self._entries.popitem(last=False)
+                    self.current_bytes -= len(old_content)
+                    self.evictions += 1
+                    evicted.append((old_etag, old_content))
+
+        if self.spill_dir is not None:
+            for old_etag, old_content in evicted:
+                self._spill(old_etag, old_content)
+
+    def _spill(self, etag, content):
+        path = self._spill_path(etag)
+        if path.exists():
+            return
+        try:
+            self.spill_dir.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_suffix(f".{os.getpid()}.tmp")
+            tmp.write_bytes(content)
+            os.replace(tmp, path)
+        except OSError:
+            pass
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "current_bytes": self.current_bytes,
+                "max_bytes": self.max_bytes,
+                "spill_dir": str(self.spill_dir) if self.spill_dir else None,
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+render_cache = RenderCache()
@@ -0,0 +1,99 @@
+import numpy as np
+import rasterio
+from rasterio.features import geometry_mask, geometry_window
+from rasterio.warp import transform_geom
+
+from app.constants import LULC_CLASSES
+from app.services.analytics_service import (
+    encode_classes, class_counts, transition_counts,
+    area_stats_from_counts, change_stats_from_counts
+)
+from app.services.confidence_service import ValueHistogram, confidence_values, value_scale
+from app.services.raster_service import read_window, raster_info
+
+# Region-of-interest statistics only touch the pixel window covering the
+# geometry: the window is read (or sliced from the raster cache) and
+# pixels outside the rasterized geometry are treated as nodata.
+
+def parse_geometries(geojson):
+    """Geometries of a GeoJSON geometry, Feature or FeatureCollection."""
+    kind = geojson.get("type")
+    if kind == "FeatureCollection":
+        return [f["geometry"] for f in geojson.get("features", []) if f.get("geometry")]
+    if kind == "Feature":
+        return [geojson["geometry"]] if geojson.get("geometry") else []
+    if kind in ("Polygon", "MultiPolygon", "GeometryCollection"):
+        return [geojson]
+    raise ValueError(f"Unsupported GeoJSON type for a region of interest: {kind}")
+
+def bbox_geometry(bbox):
+    """GeoJSON polygon for a [min_lon, min_lat, max_lon, max_lat] box."""
+    west, south, east, north = bbox
+    return {
+        "type": "Polygon",
+        "coordinates": [[[west, south], [east, south], [east, north], [west, north], [west, south]]]
+    }
+
+class RegionOfInterest:
+    """Pixel window and inside-mask of WGS84 geometries on a raster grid."""
+
+    def __init__(self, grid_path, geometries, crs="EPSG:4326"):
+        with rasterio.open(grid_path) as src:
+            self.shape = src.shape
+            geoms = [transform_geom(crs, src.crs, g) for g in geometries]
+            # Raises rasterio.errors.WindowError when outside the raster
+            self.window = geometry_window(src, geoms)
+            transform = src.window_transform(self.window)
+
+        self.mask = geometry_mask(
+            geoms,
+            out_shape=(int(self.window.height), int(self.window.width)),
+            transform=transform,
+            invert=True,
+        )
+        self.pixel_count = int(self.mask.sum())
+
+    def read(self, path):
+        if raster_info(path)["shape"] != self.shape:
+            raise ValueError(f"Raster {path} is not on the ROI grid")
+        return read_window(path, self.window)
+
+    def encoded_lulc(self, path):
+        """Encoded class bins of the ROI window; outside pixels become nodata."""
+        index = encode_classes(self.read(path), nodata=raster_info(path)["nodata"] or 0)
+        index[~self.mask] = len(LULC_CLASSES) + 1
+        return index
+
+    def area_stats(self, path, pixel_size=10):
+        counts = class_counts(self.encoded_lulc(path), encoded=True)
+        return area_stats_from_counts(counts, pixel_size=pixel_size)
+
+    def change_stats(self, old_path, new_path, pixel_size=10):
+        counts = transition_counts(
+            self.encoded_lulc(old_path), self.encoded_lulc(new_path), encoded=True
+        )
+        return change_stats_from_counts(counts, pixel_size=pixel_size)
+
+    def confidence_stats(self, path):
+        """
+        Confidence summary of the valid (> 0, finite) pixels inside the ROI,
+        with the same keys and rules as confidence_service.summary_stats.
+        """
+        values = self.read(path)[self.mask]
+        valid = values > 0
+        if values.dtype.kind == "f":
+            valid &= np.isfinite(values)
+        values = values[valid]
+
+        if values.size == 0:
+            return {"min": None, "max": None, "mean": None, "median": None, "valid_pixels": 0}
+
+        hist = ValueHistogram(scale=value_scale(values.dtype))
+        hist.update(confidence_values(values))
+        return {
+            "min": int(values.min()),
+            "max": int(values.max()),
+            "mean": round(float(values.sum(dtype=np.float64)) / values.size, 2),
+            "median": int(hist.median()),
+            "valid_pixels": int(values.size)
+        }
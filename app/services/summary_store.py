@@ -0,0 +1,171 @@
+import json
+import os
+import threading
+
+from app.config import DATA_DIR, SUMMARY_DIR
+from app.services.analytics_service import area_stats, change_stats
+from app.services.confidence_service import summary_stats, stats_by_class, stats_by_change
+from app.services.catalog import layer_signature
+from app.services.raster_cache import file_signature, file_hash
+from app.services.raster_service import (
+    load_lulc, lulc_path, change_path, confidence_path, raster_info
+)
+from app.services.hotspot_service import load_pyramid, hotspot_geojson
+
+# Bump when the layout of any summary payload changes; older sidecars are
+# then treated as stale.
+SUMMARY_VERSION = 2
+
+# --------------------------------------------------
+# Summary kinds: source files and live computation
+# --------------------------------------------------
+# Every route answer is a pure function of the source rasters listed here.
+SUMMARY_KINDS = {
+    "lulc": (
+        lambda year: [lulc_path(year)],
+        lambda year: area_stats(load_lulc(year)),
+    ),
+    "change": (
+        lambda start, end: [lulc_path(start), lulc_path(end)],
+        lambda start, end: change_stats(load_lulc(start), load_lulc(end)),
+    ),
+    "confidence": (
+        lambda year: [confidence_path(year)],
+        lambda year: summary_stats(confidence_path(year)),
+    ),
+    "confidence_lulc": (
+        lambda year: [lulc_path(year), confidence_path(year)],
+        lambda year: stats_by_class(
+            lulc_path(year), confidence_path(year), raster_info(lulc_path(year))["nodata"]
+        ),
+    ),
+    "confidence_change": (
+        lambda start, end: [change_path(start, end), confidence_path(end)],
+        lambda start, end: stats_by_change(change_path(start, end), confidence_path(end)),
+    ),
+    "hotspots": (
+        lambda start, end, cell: [change_path(start, end)],
+        lambda start, end, cell: hotspot_geojson(load_pyramid(change_path(start, end)), cell),
+    ),
+}
+
+
+def summary_name(kind, *params):
+    return "_".join([kind, *(str(p) for p in params)])
+
+
+def sidecar_path(kind, *params):
+    return SUMMARY_DIR / f"{summary_name(kind, *params)}.json"
+
+
+def _source_record(path):
+    mtime_ns, size = file_signature(path)
+    return {
+        "path": os.path.relpath(path, DATA_DIR),
+        "sha256": file_hash(path),
+        "mtime_ns": mtime_ns,
+        "size": size,
+    }
+
+
+def write_summary(kind, *params):
+    """Compute a summary live and write it as a versioned sidecar."""
+    sources_fn, compute_fn = SUMMARY_KINDS[kind]
+    sources = [_source_record(p) for p in sources_fn(*params)]
+    payload = compute_fn(*params)
+
+    path = sidecar_path(kind, *params)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(f".{os.getpid()}.tmp")
+    with open(tmp, "w") as f:
+        json.dump({
+            "version": SUMMARY_VERSION,
+            "kind": kind,
+            "params": list(params),
+            "sources": sources,
+            "payload": payload,
+        }, f)
+    os.replace(tmp, path)
+    return path
+
+
+def _source_is_current(record, path):
+    """Cheap stat check first; only rehash when the stat no longer matches."""
+    if os.path.relpath(path, DATA_DIR) != record["path"]:
+        return False
+    mtime_ns, size = layer_signature(path)
+    if (mtime_ns, size) == (record["mtime_ns"], record["size"]):
+        return True
+    return size == record["size"] and file_hash(path) == record["sha256"]
+
+
+_sidecar_lock = threading.Lock()
+_sidecars = {}
+
+
+def _read_sidecar(path):
+    """Parsed sidecar, re-read only when the sidecar file itself changes."""
+    try:
+        signature = file_signature(path)
+    except OSError:
+        return None
+
+    with _sidecar_lock:
+        entry = _sidecars.get(path)
+    if entry is not None and entry[0] == signature:
+        return entry[1]
+
+    try:
+        with open(path) as f:
+            doc = json.load(f)
+    except (OSError, ValueError):
+        return None
+
+    with _sidecar_lock:
+        _sidecars[path] = (signature, doc)
+    return doc
+
+
+def load_summary(kind, *params):
+    """Payload of a fresh sidecar, or None when missing or stale."""
+    sources_fn, _ = SUMMARY_KINDS[kind]
+    doc = _read_sidecar(sidecar_path(kind, *params))
+    if doc is None or doc.get("version") != SUMMARY_VERSION:
+        return None
+
+    sources = sources_fn(*params)
+    if len(sources) != len(doc["sources"]):
+        return None
+    try:
+        if not all(_source_is_current(r, p) for r, p in zip(doc["sources"], sources)):
+            return None
+    except OSError:
+        return None
+    return doc["payload"]
+
+
+# Live-computed payloads, keyed by (kind, params) and kept while the source
+# fingerprints match, so a summary without a sidecar is computed once per
+# worker (e.g. by the warm-up) rather than on every request.
+_live_lock = threading.Lock()
+_live = {}
+
+
+def get_summary(kind, *params):
+    """Serve a summary from its sidecar, falling back to live computation."""
+    payload = load_summary(kind, *params)
+    if payload is not None:
+        return payload
+
+    sources_fn, compute_fn = SUMMARY_KINDS[kind]
+    key = (kind, *params)
+    signatures = [layer_signature(p) for p in sources_fn(*params)]
+    with _live_lock:
+        entry = _live.get(key)
+    if entry is not None and entry[0] == signatures:
+        return entry[1]
+
+    payload = compute_fn(*params)
+    with _live_lock:
+        _live[key] = (signatures, payload)
+    return payload
@@ -0,0 +1,103 @@
+import numpy as np
+import rasterio
+from rasterio.enums import Resampling
+from rasterio.transform import from_bounds
+from rasterio.vrt import WarpedVRT
+from rasterio.warp import transform_bounds
+from app.services.image_service import encode_indexed_png
+from app.services.metrics import timed
+
+TILE_SIZE = 256
+WEB_MERCATOR = "EPSG:3857"
+
+# Half the circumference of the earth in Web Mercator metres
+ORIGIN_SHIFT = 20037508.342789244
+
+MAX_ZOOM = 22
+
+_empty_tile = None
+
+def empty_tile():
+    """Fully transparent tile, encoded once and reused."""
+    global _empty_tile
+    if _empty_tile is None:
+        _empty_tile = encode_indexed_png(
+            np.zeros((TILE_SIZE, TILE_SIZE), dtype=np.uint8), [(0, 0, 0, 0)]
+        )
+    return _empty_tile
+
+def tile_bounds(z: int, x: int, y: int):
+    """Web Mercator (left, bottom, right, top) of an XYZ tile."""
+    if not 0 <= z <= MAX_ZOOM:
+        raise ValueError(f"Zoom level must be between 0 and {MAX_ZOOM}")
+    n = 2 ** z
+    if not (0 <= x < n and 0 <= y < n):
+        raise ValueError(f"Tile {z}/{x}/{y} is outside the tile grid")
+
+    size = 2 * ORIGIN_SHIFT / n
+    left = -ORIGIN_SHIFT + x * size
+    top = ORIGIN_SHIFT - y * size
+    return left, top - size, left + size, top
+
+def _intersects(a, b):
+    return a[0] < b[2] and a[2] > b[0] and a[1] < b[3] and a[3] > b[1]
+
+def _overview_level(src, bounds):
+    """
+    Index of the coarsest overview that still has at least the tile's
+    resolution, or None to read full resolution.
+    """
+    factors = src.overviews(1)
+    if not factors:
+        return None
+    left, bottom, right, top = transform_bounds(WEB_MERCATOR, src.crs, *bounds)
+    tile_res = (right - left) / TILE_SIZE
+    decimation = tile_res / abs(src.res[0])
+    level = None
+    for i, factor in enumerate(factors):
+        if factor <= decimation:
+            level = i
+    return level
+
+@timed("tile_warp")
+def _warp_tile(src, bounds):
+    with WarpedVRT(
+        src,
+        crs=WEB_MERCATOR,
+        transform=from_bounds(*bounds, TILE_SIZE, TILE_SIZE),
+        width=TILE_SIZE,
+        height=TILE_SIZE,
+        src_nodata=src.nodata,
+        nodata=0,
+        resampling=Resampling.nearest,
+    ) as vrt:
+        return vrt.read(1)
+
+def render_tile(path, z: int, x: int, y: int, create_image):
+    """
+    Render one 256x256 XYZ tile of a single-band raster as PNG bytes.
+
+    Only the source pixels under the tile are read: GDAL warps straight
+    from the raster into the tile grid (nearest neighbour, so class codes
+    are preserved), using the closest overview for zoomed-out tiles. Tiles
+    outside the raster or without data are served as the shared
+    transparent tile without touching the renderer.
+    """
+    bounds = tile_bounds(z, x, y)
+
+    with rasterio.open(path) as src:
+        raster_bounds = transform_bounds(src.crs, WEB_MERCATOR, *src.bounds)
+        if not _intersects(bounds, raster_bounds):
+            return empty_tile()
+        level = _overview_level(src, bounds)
+        if level is None:
+            data = _warp_tile(src, bounds)
+
+    if level is not None:
+        with rasterio.open(path, overview_level=level) as src:
+            data = _warp_tile(src, bounds)
+
+    if not data.any():
+        return empty_tile()
+
+    return create_image(data)
@@ -0,0 +1,138 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+
+import numpy as np
+
+from app.config import WARMUP_ENABLED, WARMUP_WORKERS
+from app.precompute import discover_jobs
+from app.services.array_store import read_header
+from app.services.catalog import catalog
+from app.services.cube_service import get_cube
+from app.services.raster_cache import raster_cache
+from app.services.raster_service import load_raster
+from app.services.summary_store import get_summary, summary_name
+
+# Startup warm-up: decode the served rasters into the raster cache, then
+# load (or compute and memoise) every summary and open (or build) the
+# memory-mapped pixel cube, so the first real request is as fast as the rest.
+# Rasters go first so summaries that fall back to live computation find
+# them decoded. Only as many rasters are decoded as fit in
+# RASTER_CACHE_BYTES; array-store entries are memory-mapped and free.
+
+def discover_layers():
+    """(name, path) of every LULC, change and confidence raster in the catalog."""
+    return [
+        ("/".join([r["kind"], *(str(y) for y in r["years"])]), r["path"])
+        for r in catalog.layers()
+    ]
+
+
+def _decoded_bytes(path):
+    """Upper bound of the cache footprint of a raster (0 if memory-mapped)."""
+    if read_header(path) is not None:
+        return 0
+    info = catalog.info(path)
+    if info is None:
+        return 0
+    height, width = info["shape"]
+    return height * width * np.dtype(info["dtype"]).itemsize
+
+
+class Warmup:
+    """Background cache hydration with per-task state and timings."""
+
+    def __init__(self, workers=WARMUP_WORKERS):
+        self.workers = workers
+        self._lock = threading.Lock()
+        self._tasks = {}
+        self._thread = None
+        self._stop = threading.Event()
+        self.started_at = None
+        self.finished_at = None
+
+    def _set(self, name, **fields):
+        with self._lock:
+            self._tasks.setdefault(name, {"name": name, "state": "pending"}).update(fields)
+
+    def _run(self, name, fn, *args):
+        if self._stop.is_set():
+            return
+        self._set(name, state="warming")
+        started = time.perf_counter()
+        try:
+            fn(*args)
+            self._set(name, state="ready", seconds=round(time.perf_counter() - started, 3))
+        except Exception as e:
+            self._set(name, state="failed", seconds=round(time.perf_counter() - started, 3),
+                      error=str(e))
+
+    def _phase(self, pool, tasks):
+        wait([pool.submit(self._run, *task) for task in tasks])
+
+    def _within_budget(self, layers):
+        """Layers whose decoded size still fits the raster cache; the rest are skipped."""
+        budget = raster_cache.max_bytes
+        selected = []
+        for name, path in layers:
+            size = _decoded_bytes(path)
+            if size <= budget:
+                budget -= size
+                selected.append((name, load_raster, path))
+            else:
+                self._set(name, state="skipped", reason="does not fit in RASTER_CACHE_BYTES")
+        return selected
+
+    def _warm(self):
+        layers = discover_layers()
+        summaries = [
+            (f"summary/{summary_name(*job)}", get_summary, *job) for job in discover_jobs()
+        ]
+        for name, *_ in layers + summaries + [("pixel_cube",)]:
+            self._set(name, state="pending")
+        layers = self._within_budget(layers)
+
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="warmup") as pool:
+            self._phase(pool, layers)
+            self._phase(pool, summaries)
+            self._phase(pool, [("pixel_cube", get_cube)])
+        self.finished_at = time.time()
+
+    def start(self):
+        """Start warming in a background thread (no-op if disabled or started)."""
+        if not WARMUP_ENABLED or self._thread is not None:
+            return
+        self.started_at = time.time()
+        self._thread = threading.Thread(target=self._warm, name="warmup", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Skip tasks that have not started yet (e.g. on shutdown)."""
+        self._stop.set()
+
+    def status(self):
+        with self._lock:
+            tasks = [dict(t) for t in self._tasks.values()]
+
+        # Failed tasks are reported but do not gate readiness: warm-up runs
+        # once, every worker would fail the same way, and the healthy layers
+        # should keep being served (the failed ones compute on demand)
+        failed = sum(t["state"] == "failed" for t in tasks)
+        if not WARMUP_ENABLED:
+            state = "disabled"
+        elif self.finished_at is None:
+            state = "warming"
+        else:
+            state = "degraded" if failed else "ready"
+
+        end = self.finished_at or time.time()
+        return {
+            "ready": state != "warming",
+            "state": state,
+            "elapsed_seconds": round(end - self.started_at, 3) if self.started_at else None,
+            "failed": failed,
+            "layers": tasks
+        }
+
+
+warmup = Warmup()
@@ -0,0 +1,115 @@
+from functools import lru_cache
+
+import geopandas as gpd
+import numpy as np
+from rasterio.features import rasterize
+
+from app.config import ZONES_PATH, ZONE_NAME_FIELD, ZONE_NAME_FIELDS
+from app.constants import LULC_CLASSES
+from app.services.analytics_service import encode_classes
+from app.services.raster_cache import raster_cache, file_signature
+from app.services.raster_service import iter_windows, raster_info
+
+# Zones are rasterized once per (boundary file, raster) onto a uint8 label
+# raster (uint16 beyond 255 zones): 0 = outside every zone, z = z-th
+# boundary feature. All per-zone tables then come from bincounts over
+# zone * B + bin, streamed window by window (raster_service.iter_windows)
+# with the narrowest code dtype that fits, so no full-size code arrays are
+# built.
+# Pass n_zones so zones that do not intersect the grid still get a row.
+
+@lru_cache(maxsize=4)
+def _read_zones(path, signature):
+    zones = gpd.read_file(path)
+    field = ZONE_NAME_FIELD or next(
+        (f for f in ZONE_NAME_FIELDS if f in zones.columns), None
+    )
+    names = [
+        str(zones[field].iloc[i]) if field else f"Zone {i + 1}"
+        for i in range(len(zones))
+    ]
+    return zones, names
+
+def load_zones(path=ZONES_PATH):
+    """Boundary GeoDataFrame and zone names (cached per file fingerprint)."""
+    return _read_zones(str(path), file_signature(path))
+
+def _rasterize_zones(grid_path, zones_path):
+    info = raster_info(grid_path)
+    zones, _ = load_zones(zones_path)
+    zones = zones.to_crs(info["crs"].to_wkt())
+    return rasterize(
+        ((geom, i) for i, geom in enumerate(zones.geometry, start=1) if geom is not None),
+        out_shape=info["shape"],
+        transform=info["transform"],
+        fill=0,
+        dtype="uint8" if len(zones) <= 255 else "uint16",
+    )
+
+def zone_labels(grid_path, zones_path=ZONES_PATH):
+    """
+    Zone label raster aligned to the grid of grid_path, held by the raster
+    cache (within RASTER_CACHE_BYTES) per grid raster and boundary
+    fingerprint.
+    """
+    return raster_cache.get(
+        grid_path,
+        lambda path: _rasterize_zones(path, zones_path),
+        variant=("zones", str(zones_path), file_signature(zones_path)),
+    )
+
+def _code_dtype(n_codes):
+    """Smallest unsigned dtype holding zone * B (* B) + bin codes."""
+    if n_codes <= 1 << 16:
+        return np.uint16
+    return np.uint32 if n_codes <= 1 << 32 else np.int64
+
+def _zone_count(labels, n_zones):
+    return max(n_zones, int(labels.max(initial=0))) + 1
+
+def zone_class_counts(labels, lulc_path, nodata=0, n_zones=0, classes=LULC_CLASSES):
+    """(Z + 1) x B class counts per zone (row 0 = outside all zones)."""
+    b = len(classes) + 2  # classes, unknown code, nodata
+    zones = _zone_count(labels, n_zones)
+    dtype = _code_dtype(zones * b)
+    counts = np.zeros(zones * b, dtype=np.int64)
+    for zone, lulc in iter_windows([labels, lulc_path]):
+        code = zone.astype(dtype) * b
+        code += encode_classes(lulc, classes, nodata)
+        counts += np.bincount(code.ravel(), minlength=zones * b)
+    return counts.reshape(zones, b)
+
+def zone_transition_counts(labels, old_path, new_path, nodata=0, n_zones=0, classes=LULC_CLASSES):
+    """(Z + 1) x B x B transition counts per zone (row 0 = outside all zones)."""
+    b = len(classes) + 2  # classes, unknown code, nodata
+    zones = _zone_count(labels, n_zones)
+    dtype = _code_dtype(zones * b * b)
+    counts = np.zeros(zones * b * b, dtype=np.int64)
+    for zone, old, new in iter_windows([labels, old_path, new_path]):
+        code = zone.astype(dtype) * b
+        code += encode_classes(old, classes, nodata)
+        code *= b
+        code += encode_classes(new, classes, nodata)
+        counts += np.bincount(code.ravel(), minlength=zones * b * b)
+    return counts.reshape(zones, b, b)
+
+def zone_confidence(labels, lulc_path, conf_path, nodata=0, n_zones=0, classes=LULC_CLASSES):
+    """
+    (Z + 1) x B valid-pixel counts and confidence sums per zone and class.
+    Confidence value 0 (or NaN) represents nodata; those pixels go to the
+    nodata bin.
+    """
+    b = len(classes) + 2  # classes, unknown code, nodata
+    zones = _zone_count(labels, n_zones)
+    dtype = _code_dtype(zones * b)
+    counts = np.zeros(zones * b, dtype=np.int64)
+    sums = np.zeros(zones * b, dtype=np.float64)
+    for zone, lulc, conf in iter_windows([labels, lulc_path, conf_path]):
+        index = encode_classes(lulc, classes, nodata)
+        index[~(conf > 0)] = b - 1
+        code = zone.astype(dtype) * b
+        code += index
+        code = code.ravel()
+        counts += np.bincount(code, minlength=zones * b)
+        sums += np.bincount(code, weights=conf.ravel(), minlength=zones * b)
+    return counts.reshape(zones, b), sums.reshape(zones, b)
@@ -1,9 +1,9 @@
-import { MapContainer, TileLayer, ImageOverlay, useMap } from "react-leaflet";
+import { MapContainer, TileLayer, useMap } from "react-leaflet";
 import "leaflet/dist/leaflet.css";
 import { Layers, Shield, Maximize2, Info } from "lucide-react";
 import MapLegend from "./MapLegend";
 import { useEffect, useState, useCallback } from "react";
-import { fetchMapBounds, getLULCMapUrl, getChangeMapUrl, getConfidenceMapUrl } from "@/services/api";
+import { fetchMapBounds, getLULCTileUrl, getChangeTileUrl, getConfidenceTileUrl } from "@/services/api";
 
 interface MapViewerProps {
     startYear: number;
@@ -138,16 +138,16 @@ const MapViewer = ({
                             />
 
                             {showLULC && (
-                                <ImageOverlay
-                                    url={getLULCMapUrl(startYear)}
+                                <TileLayer
+                                    url={getLULCTileUrl(startYear)}
                                     bounds={bounds}
                                     opacity={0.8}
                                 />
                             )}
 
                             {showConfidence && (
-                                <ImageOverlay
-                                    url={getConfidenceMapUrl(startYear)}
+                                <TileLayer
+                                    url={getConfidenceTileUrl(startYear)}
                                     bounds={bounds}
                                     opacity={0.6}
                                 />
@@ -185,24 +185,24 @@ const MapViewer = ({
                             />
 
                             {showLULC && (
-                                <ImageOverlay
-                                    url={getLULCMapUrl(endYear)}
+                                <TileLayer
+                                    url={getLULCTileUrl(endYear)}
                                     bounds={bounds}
                                     opacity={0.8}
                                 />
                             )}
 
                             {showOverlay && (
-                                <ImageOverlay
-                                    url={getChangeMapUrl(startYear, endYear)}
+                                <TileLayer
+                                    url={getChangeTileUrl(startYear, endYear)}
                                     bounds={bounds}
                                     opacity={0.9}
                                 />
                             )}
 
                             {showConfidence && (
-                                <ImageOverlay
-                                    url={getConfidenceMapUrl(endYear)}
+                                <TileLayer
+                                    url={getConfidenceTileUrl(endYear)}
                                     bounds={bounds}
                                     opacity={0.6}
                                 />
@@ -97,3 +97,8 @@ export const fetchMapBounds = async (): Promise<[[number, number], [number, numb
 export const getLULCMapUrl = (year: number) => `${API_BASE_URL}/map/lulc/${year}`;
 export const getChangeMapUrl = (start: number, end: number) => `${API_BASE_URL}/map/change/${start}/${end}`;
 export const getConfidenceMapUrl = (year: number) => `${API_BASE_URL}/map/confidence/${year}`;
+
+// XYZ tile templates for Leaflet TileLayer ({z}/{x}/{y} are filled in by Leaflet)
+export const getLULCTileUrl = (year: number) => `${API_BASE_URL}/map/tiles/lulc/{z}/{x}/{y}.png?year=${year}`;
+export const getChangeTileUrl = (start: number, end: number) => `${API_BASE_URL}/map/tiles/change/{z}/{x}/{y}.png?start=${start}&end=${end}`;
+export const getConfidenceTileUrl = (year: number) => `${API_BASE_URL}/map/tiles/confidence/{z}/{x}/{y}.png?year=${year}`;
@@ -1,4 +1,4 @@
-import numpy as np
+from app.services.analytics_service import class_counts, transition_counts
 
 LULC_CLASSES = {
     1: "Forest",
@@ -13,10 +13,11 @@ def area_stats(lulc_array, pixel_size=10):
     Calculate area (hectares) for each LULC class
     """
     pixel_area_ha = (pixel_size * pixel_size) / 10000
+    counts = class_counts(lulc_array, classes=LULC_CLASSES)
     stats = {}
 
-    for cls, name in LULC_CLASSES.items():
-        area = np.sum(lulc_array == cls) * pixel_area_ha
+    for i, name in enumerate(LULC_CLASSES.values()):
+        area = counts[i] * pixel_area_ha
         stats[name] = round(float(area), 2)
 
     return stats
@@ -27,12 +28,12 @@ def change_stats(lulc_old, lulc_new, pixel_size=10):
     Calculate LULC transition matrix (area in hectares)
     """
     pixel_area_ha = (pixel_size * pixel_size) / 10000
+    counts = transition_counts(lulc_old, lulc_new, classes=LULC_CLASSES)
     transitions = {}
 
-    for i, from_name in LULC_CLASSES.items():
-        for j, to_name in LULC_CLASSES.items():
-            mask = (lulc_old == i) & (lulc_new == j)
-            area = np.sum(mask) * pixel_area_ha
+    for i, from_name in enumerate(LULC_CLASSES.values()):
+        for j, to_name in enumerate(LULC_CLASSES.values()):
+            area = counts[i, j] * pixel_area_ha
             key = f"{from_name} → {to_name}"
             transitions[key] = round(float(area), 2)
 
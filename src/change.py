@@ -1,10 +1,96 @@
 """
 change.py
 Module for change detection.
+
+Reads two LULC years window by window and writes a transition-coded change
+raster (from * 10 + to, 0 = nodata), accumulating the full transition
+matrix in the same pass.
 """
+import os
+
+import numpy as np
+import rasterio
+
+from app.config import STATS_WINDOW_PIXELS
+from app.constants import LULC_CLASSES
+from app.services.analytics_service import (
+    class_bins, encode_classes, transition_code_lut, change_stats_from_counts
+)
+from app.services.raster_service import aligned_windows, lulc_path, change_path
+
+
+def iter_transitions(old_path, new_path, classes=LULC_CLASSES, max_pixels=STATS_WINDOW_PIXELS):
+    """
+    Stream aligned windows of two LULC rasters. Yields (window, codes,
+    counts) per window: the uint8 transition codes and that window's
+    (K+2) x (K+2) transition counts (see analytics_service).
+    """
+    b = class_bins(classes)
+    code_lut = transition_code_lut(classes)
+
+    with rasterio.open(old_path) as old_src, rasterio.open(new_path) as new_src:
+        if old_src.shape != new_src.shape:
+            raise ValueError(
+                f"LULC rasters differ in shape: {old_src.shape} vs {new_src.shape}"
+            )
+        old_nodata = 0 if old_src.nodata is None else old_src.nodata
+        new_nodata = 0 if new_src.nodata is None else new_src.nodata
+
+        for window in aligned_windows(old_src, max_pixels):
+            old_idx = encode_classes(old_src.read(1, window=window), classes, old_nodata)
+            new_idx = encode_classes(new_src.read(1, window=window), classes, new_nodata)
+
+            pair = old_idx.astype(np.uint16 if b * b > 256 else np.uint8)
+            pair *= b
+            pair += new_idx
+
+            counts = np.bincount(pair.ravel(), minlength=b * b).reshape(b, b)
+            yield window, code_lut[pair], counts
+
+
+def detect_changes(start_year, end_year, old_path=None, new_path=None, out_path=None,
+                   classes=LULC_CLASSES, max_pixels=STATS_WINDOW_PIXELS):
+    """
+    Write the transition-coded change raster for start_year -> end_year
+    (by default Tirupati_LULC_Change_{start}_{end}.tif in CHANGE_DIR) and
+    return the transition count matrix accumulated along the way.
+    """
+    old_path = old_path or lulc_path(start_year)
+    new_path = new_path or lulc_path(end_year)
+    out_path = out_path or change_path(start_year, end_year)
+
+    with rasterio.open(old_path) as src:
+        profile = src.profile.copy()
+
+    profile.update(
+        driver="GTiff",
+        count=1,
+        dtype="uint8",
+        nodata=0,
+        tiled=True,
+        blockxsize=512,
+        blockysize=512,
+        compress="deflate",
+        predictor=2,
+    )
+    profile.pop("photometric", None)
+    os.makedirs(os.path.dirname(out_path) or ".", exist_ok=True)
+
+    b = class_bins(classes)
+    total = np.zeros((b, b), dtype=np.int64)
+
+    with rasterio.open(out_path, "w", **profile) as dst:
+        for window, codes, counts in iter_transitions(old_path, new_path, classes, max_pixels):
+            dst.write(codes, 1, window=window)
+            total += counts
+
+    changed = int(total[:len(classes), :len(classes)].sum() - np.trace(total[:len(classes), :len(classes)]))
+    print(f"✅ Saved change raster: {out_path}")
+    print(f"🔁 {changed:,} changed pixels between {start_year} and {end_year}")
+    return total
 
-def detect_changes():
-    pass
 
 if __name__ == "__main__":
-    detect_changes()
+    counts = detect_changes(2018, 2024)
+    for row in change_stats_from_counts(counts)["breakdown"]:
+        print(f"{row['from_class']} -> {row['to_class']}: {row['area_ha']} ha")
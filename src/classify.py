@@ -1,10 +1,141 @@
 """
 classify.py
 Module for classification tasks.
+
+Applies a trained scikit-learn classifier to a feature stack (see
+features.compute_feature_stack) window by window across a process pool and
+writes the LULC and max-probability confidence rasters served by the API.
 """
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+
+import joblib
+import numpy as np
+import rasterio
+from rasterio.windows import Window
+
+from app.config import LULC_DIR, CONFIDENCE_DIR
+
+# Per-process state, set by _init_worker
+_model = None
+_features = None
+_batch_size = None
+
+
+def _init_worker(model_path, feature_path, batch_size):
+    global _model, _features, _batch_size
+    _model = joblib.load(model_path)
+    _features = rasterio.open(feature_path)
+    _batch_size = batch_size
+
+
+def _classify_window(window):
+    """
+    Classify one window of the feature stack. Returns the window with its
+    uint8 class codes and confidence (max probability, 1-100); pixels with
+    missing features get 0 in both.
+    """
+    col, row, width, height = window
+    block = _features.read(window=Window(col, row, width, height), out_dtype="float32")
+    bands = block.shape[0]
+
+    # Pixels as contiguous (n, bands) float32 rows for predict_proba
+    pixels = np.ascontiguousarray(block.reshape(bands, -1).T)
+    valid = np.isfinite(pixels).all(axis=1)
+    if _features.nodata is not None:
+        valid &= (pixels != _features.nodata).any(axis=1)
+
+    labels = np.zeros(pixels.shape[0], dtype=np.uint8)
+    confidence = np.zeros(pixels.shape[0], dtype=np.uint8)
+    index = np.flatnonzero(valid)
+    classes = np.asarray(_model.classes_)
+
+    for start in range(0, index.size, _batch_size):
+        batch = index[start:start + _batch_size]
+        proba = _model.predict_proba(pixels[batch])
+        best = proba.argmax(axis=1)
+        labels[batch] = classes[best]
+        confidence[batch] = np.clip(np.rint(proba[np.arange(best.size), best] * 100), 1, 100)
+
+    return window, labels.reshape(height, width), confidence.reshape(height, width)
+
+
+def classify(model_path, feature_path, year, lulc_dir=LULC_DIR, confidence_dir=CONFIDENCE_DIR,
+             workers=None, block_size=512, batch_size=65536):
+    """
+    Classify a feature stack into Tirupati_LULC_{year}.tif and
+    Tirupati_Confidence_{year}.tif (uint8, 0 = nodata).
+
+    Windows are fanned out to a process pool, each worker holding its own
+    model and feature-stack handle; at most two windows per worker are in
+    flight, so memory stays bounded. Returns throughput in pixels/s.
+    """
+    with rasterio.open(feature_path) as src:
+        profile = src.profile.copy()
+        height, width = src.shape
+
+    profile.update(
+        driver="GTiff",
+        count=1,
+        dtype="uint8",
+        nodata=0,
+        tiled=True,
+        blockxsize=block_size,
+        blockysize=block_size,
+        compress="deflate",
+        predictor=2,
+    )
+    profile.pop("photometric", None)
+    os.makedirs(lulc_dir, exist_ok=True)
+    os.makedirs(confidence_dir, exist_ok=True)
+    lulc_path = os.path.join(lulc_dir, f"Tirupati_LULC_{year}.tif")
+    confidence_path = os.path.join(confidence_dir, f"Tirupati_Confidence_{year}.tif")
+
+    windows = iter([
+        (col, row, min(block_size, width - col), min(block_size, height - row))
+        for row in range(0, height, block_size)
+        for col in range(0, width, block_size)
+    ])
+
+    started = time.perf_counter()
+    workers = workers or os.cpu_count() or 1
+
+    with rasterio.open(lulc_path, "w", **profile) as lulc_dst, \
+            rasterio.open(confidence_path, "w", **profile) as conf_dst, \
+            ProcessPoolExecutor(
+                max_workers=workers,
+                initializer=_init_worker,
+                initargs=(model_path, feature_path, batch_size),
+            ) as pool:
+        pending = set()
+        while True:
+            for window in windows:
+                pending.add(pool.submit(_classify_window, window))
+                if len(pending) >= 2 * workers:
+                    break
+            if not pending:
+                break
+
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                (col, row, w, h), labels, confidence = future.result()
+                window = Window(col, row, w, h)
+                lulc_dst.write(labels, 1, window=window)
+                conf_dst.write(confidence, 1, window=window)
+
+    elapsed = time.perf_counter() - started
+    throughput = height * width / elapsed if elapsed > 0 else float("inf")
+
+    print(f"✅ Saved classification: {lulc_path}")
+    print(f"✅ Saved confidence: {confidence_path}")
+    print(f"⏱️  {height * width:,} pixels in {elapsed:.1f}s ({throughput:,.0f} pixels/s)")
+    return throughput
 
-def classify():
-    pass
 
 if __name__ == "__main__":
-    classify()
+    classify(
+        model_path="models/lulc_classifier.joblib",
+        feature_path="data/processed/features.tif",
+        year=2025
+    )
@@ -1,6 +1,9 @@
 import rasterio
 import numpy as np
 import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from rasterio.windows import Window
 
 def read_band(path):
     with rasterio.open(path) as src:
@@ -9,19 +12,30 @@ def read_band(path):
     return band, meta
 
 
-def compute_ndvi(nir, red):
-    ndvi = (nir - red) / (nir + red + 1e-6)
-    return ndvi
+def _normalized_difference(a, b, out=None, tmp=None):
+    """(a - b) / (a + b + 1e-6), optionally into preallocated buffers."""
+    dtype = np.result_type(a, b, np.float32)
+    if out is None:
+        out = np.empty(np.shape(a), dtype=dtype)
+    if tmp is None:
+        tmp = np.empty(np.shape(a), dtype=dtype)
+    np.subtract(a, b, out=out)
+    np.add(a, b, out=tmp)
+    tmp += 1e-6
+    np.divide(out, tmp, out=out)
+    return out
 
 
-def compute_ndbi(swir, nir):
-    ndbi = (swir - nir) / (swir + nir + 1e-6)
-    return ndbi
+def compute_ndvi(nir, red, out=None, tmp=None):
+    return _normalized_difference(nir, red, out, tmp)
 
 
-def compute_ndwi(green, nir):
-    ndwi = (green - nir) / (green + nir + 1e-6)
-    return ndwi
+def compute_ndbi(swir, nir, out=None, tmp=None):
+    return _normalized_difference(swir, nir, out, tmp)
+
+
+def compute_ndwi(green, nir, out=None, tmp=None):
+    return _normalized_difference(green, nir, out, tmp)
 
 
 def save_index(index, meta, out_path):
@@ -31,3 +45,130 @@ def save_index(index, meta, out_path):
         dst.write(index, 1)
 
     print(f"✅ Saved index: {out_path}")
+
+
+# --------------------------------------------------
+# Blockwise feature stack
+# --------------------------------------------------
+# Index name -> (function, input band names)
+INDICES = {
+    "ndvi": (compute_ndvi, ("nir", "red")),
+    "ndbi": (compute_ndbi, ("swir", "nir")),
+    "ndwi": (compute_ndwi, ("green", "nir")),
+}
+
+
+def _block_windows(height, width, block_size):
+    for row in range(0, height, block_size):
+        for col in range(0, width, block_size):
+            yield Window(col, row, min(block_size, width - col), min(block_size, height - row))
+
+
+def compute_feature_stack(band_paths, out_path, indices=("ndvi", "ndbi", "ndwi"),
+                          workers=4, block_size=512, compress="deflate"):
+    """
+    Compute several spectral indices in one blockwise pass and write them as
+    a single tiled, compressed float32 multi-band GeoTIFF.
+
+    band_paths maps band names ("nir", "red", "swir", "green") to single-band
+    rasters on the same grid. Each window reads every needed band once into
+    per-thread float32 buffers, computes all indices into preallocated
+    output buffers, and windows are processed across a thread pool, so
+    memory stays bounded by workers x block size.
+    """
+    unknown = [name for name in indices if name not in INDICES]
+    if unknown:
+        raise ValueError(f"Unknown indices: {unknown}. Available: {list(INDICES)}")
+
+    bands = sorted({b for name in indices for b in INDICES[name][1]})
+    missing = [b for b in bands if b not in band_paths]
+    if missing:
+        raise ValueError(f"Missing input bands for {list(indices)}: {missing}")
+
+    with rasterio.open(band_paths[bands[0]]) as ref:
+        profile = ref.profile.copy()
+        height, width = ref.shape
+    for b in bands[1:]:
+        with rasterio.open(band_paths[b]) as src:
+            if src.shape != (height, width):
+                raise ValueError(f"Band '{b}' shape {src.shape} differs from {(height, width)}")
+
+    profile.update(
+        driver="GTiff",
+        dtype="float32",
+        count=len(indices),
+        nodata=None,
+        tiled=True,
+        blockxsize=block_size,
+        blockysize=block_size,
+        compress=compress,
+        predictor=3,
+        BIGTIFF="IF_SAFER",
+    )
+    os.makedirs(os.path.dirname(out_path) or ".", exist_ok=True)
+
+    # rasterio datasets are not thread-safe: each thread opens its own
+    # readers and keeps its own buffers; writes are serialised.
+    local = threading.local()
+    write_lock = threading.Lock()
+    opened = []
+
+    def _thread_state():
+        if not hasattr(local, "sources"):
+            local.sources = {b: rasterio.open(band_paths[b]) for b in bands}
+            local.inputs = {b: np.empty(block_size * block_size, dtype="float32") for b in bands}
+            local.output = np.empty(len(indices) * block_size * block_size, dtype="float32")
+            local.tmp = np.empty(block_size * block_size, dtype="float32")
+            with write_lock:
+                opened.append(local.sources)
+        return local
+
+    def _process(window, dst):
+        state = _thread_state()
+        h, w = int(window.height), int(window.width)
+        n = h * w
+
+        inputs = {}
+        for b in bands:
+            inputs[b] = state.inputs[b][:n].reshape(h, w)
+            state.sources[b].read(1, window=window, out=inputs[b])
+
+        output = state.output[:len(indices) * n].reshape(len(indices), h, w)
+        tmp = state.tmp[:n].reshape(h, w)
+        for i, name in enumerate(indices):
+            func, args = INDICES[name]
+            func(*(inputs[a] for a in args), out=output[i], tmp=tmp)
+
+        with write_lock:
+            dst.write(output, window=window)
+
+    try:
+        with rasterio.open(out_path, "w", **profile) as dst:
+            for i, name in enumerate(indices, start=1):
+                dst.set_band_description(i, name)
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                futures = [
+                    pool.submit(_process, window, dst)
+                    for window in _block_windows(height, width, block_size)
+                ]
+                for future in futures:
+                    future.result()
+    finally:
+        for sources in opened:
+            for src in sources.values():
+                src.close()
+
+    print(f"✅ Saved feature stack ({', '.join(indices)}): {out_path}")
+    return out_path
+
+
+if __name__ == "__main__":
+    compute_feature_stack(
+        band_paths={
+            "green": "data/processed/B3_clipped.tif",
+            "red": "data/processed/B4_clipped.tif",
+            "nir": "data/processed/B8_clipped.tif",
+            "swir": "data/processed/B11_clipped.tif",
+        },
+        out_path="data/processed/features.tif"
+    )
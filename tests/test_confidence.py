@@ -0,0 +1,93 @@
+"""
+Float confidence rasters against numpy, on the synthetic rasters of
+app.benchmark (no GEE data needed).
+
+Usage:
+    python -m pytest tests
+"""
+import numpy as np
+import pytest
+import rasterio
+
+from app.benchmark import SEED, generate
+from app.services.confidence_service import summary_stats, distribution, stats_by_class
+from app.services.image_service import confidence_index
+from app.services.roi_service import RegionOfInterest, bbox_geometry
+
+SIZE = 512
+# Whole synthetic extent (app.benchmark.generate)
+EXTENT = (79.2, 13.4, 79.6, 13.8)
+
+
+@pytest.fixture(scope="module")
+def rasters(tmp_path_factory):
+    return generate(SIZE, tmp_path_factory.mktemp("synthetic"))
+
+
+@pytest.fixture(scope="module", params=["unit", "fraction"])
+def confidence(request, rasters):
+    """
+    Float variant of the synthetic confidence raster: 0-1 with NaN nodata
+    ("unit") or fractional 0-100 with 0 nodata ("fraction"), both on a 0.01
+    grid so the fixed-point histograms must match numpy exactly. Yields
+    (name, path, data, valid).
+    """
+    with rasterio.open(rasters["confidence"]) as src:
+        conf = src.read(1)
+        profile = src.profile
+    if request.param == "unit":
+        data, nodata = np.where(conf > 0, conf / 100, np.nan), np.nan
+    else:
+        rng = np.random.default_rng(SEED)
+        data, nodata = np.where(conf > 0, conf - rng.integers(0, 100, conf.shape) / 100, 0), 0
+    data = data.astype(np.float32)
+
+    path = rasters["confidence"].with_name(f"Tirupati_Confidence_{request.param}.tif")
+    with rasterio.open(path, "w", **dict(profile, dtype="float32", nodata=nodata)) as dst:
+        dst.write(data, 1)
+    return request.param, path, data, np.isfinite(data) & (data > 0)
+
+
+def test_summary_stats(confidence):
+    _, path, data, valid = confidence
+    values = data[valid].astype(np.float64)
+    summary = summary_stats(path)
+    assert summary["valid_pixels"] == values.size
+    assert summary["mean"] == round(values.mean(), 2)
+    assert (summary["min"], summary["max"]) == (int(values.min()), int(values.max()))
+    assert summary["median"] == int(np.median(values))
+
+
+def test_distribution(confidence, rasters):
+    name, path, data, valid = confidence
+    values = data[valid].astype(np.float64)
+    # 0-1 rasters are reported as percentages
+    percent = values * 100 if name == "unit" else values
+    dist = distribution(path, rasters["new"], 0, percentiles=(5, 50, 95))
+    assert dist["pixel_count"] == values.size
+    for q in (5, 50, 95):
+        assert dist["percentiles"][f"{q:g}"] == pytest.approx(np.percentile(percent, q), abs=0.011)
+
+
+def test_stats_by_class(confidence, rasters):
+    _, path, data, valid = confidence
+    with rasterio.open(rasters["new"]) as src:
+        forest = valid & (src.read(1) == 1)
+    stats = stats_by_class(rasters["new"], path, 0)["Forest"]
+    assert stats["pixel_count"] == int(forest.sum())
+    assert stats["mean_confidence"] == round(float(data[forest].mean(dtype=np.float64)), 2)
+
+
+def test_confidence_index(confidence):
+    name, _, data, valid = confidence
+    # NaN / 0 transparent, then < 80, 80-90, >= 90 in percent
+    scaled = data * np.float32(100) if name == "unit" else data
+    expected = np.where(valid, 1 + (scaled >= 80) + (scaled >= 90), 0)
+    assert np.array_equal(confidence_index(data), expected)
+
+
+def test_roi_confidence_stats(confidence):
+    _, path, _, _ = confidence
+    summary = summary_stats(path)
+    roi = RegionOfInterest(path, [bbox_geometry(EXTENT)]).confidence_stats(path)
+    assert roi == {k: summary[k] for k in ("min", "max", "mean", "median", "valid_pixels")}